@@ -0,0 +1,199 @@
+# admission_status.py (materialized AdmissionProcessStatus counters)
+#
+# The dashboard counters live in a single record of the admission_status collection and are
+# adjusted on every status transition, so reading them is one get() by id. Writers in other
+# processes can still race, so reconcile() recomputes the counters from the source
+# collections and fixes any drift.
+#
+# Usage:
+#   python -m backend.data.admission_status --reconcile
+
+import argparse
+import threading
+from dataclasses import asdict, fields
+from datetime import datetime
+
+from backend.data.database import get_collection
+from backend.data.model import AdmissionProcessStatus, ApplicationStatus, LoanStatus
+from backend.data.watermark import change_stamp
+
+STATUS_RECORD_ID = "dashboard"
+
+COUNTERS = [f.name for f in fields(AdmissionProcessStatus) if f.name != "last_updated"]
+
+# Milestones are cumulative: an admitted student also counts as shortlisted and verified
+_VERIFIED = {ApplicationStatus.DOCUMENTS_VERIFIED, ApplicationStatus.SHORTLISTED,
+             ApplicationStatus.ADMITTED, ApplicationStatus.FEE_SLIP_SENT}
+_SHORTLISTED = {ApplicationStatus.SHORTLISTED, ApplicationStatus.ADMITTED, ApplicationStatus.FEE_SLIP_SENT}
+_ADMITTED = {ApplicationStatus.ADMITTED, ApplicationStatus.FEE_SLIP_SENT}
+_LOAN_PROCESSED = {LoanStatus.APPROVED, LoanStatus.REJECTED, LoanStatus.DISBURSED}
+
+# Collections whose records carry a status that feeds the counters
+STATUS_ENUMS = {"applications": ApplicationStatus, "loan_requests": LoanStatus}
+
+# Read-modify-write of the counter record is serialized within the process
+_status_lock = threading.Lock()
+
+# Page size used by reconcile() when walking the source collections
+RECONCILE_PAGE_SIZE = 5000
+
+
+def contribution(collection_name: str, status) -> dict:
+    """Counter values a single record with this status contributes to the dashboard."""
+    try:
+        status = STATUS_ENUMS[collection_name](status)
+    except ValueError:
+        return {}  # absent (None) or unknown statuses do not count towards any counter
+    if collection_name == "applications":
+        return {
+            "total_applications": 1,
+            "verified_documents": int(status in _VERIFIED),
+            "shortlisted_candidates": int(status in _SHORTLISTED),
+            "admitted_students": int(status in _ADMITTED),
+            "fee_slips_sent": int(status == ApplicationStatus.FEE_SLIP_SENT),
+        }
+    return {"loans_processed": int(status in _LOAN_PROCESSED)}
+
+
+def transition_delta(collection_name: str, old_status, new_status) -> dict:
+    """Counter changes for a record moving from old_status to new_status (None = absent)."""
+    old = contribution(collection_name, old_status)
+    new = contribution(collection_name, new_status)
+    return {name: new.get(name, 0) - old.get(name, 0) for name in set(old) | set(new)}
+
+
+def _read_record():
+    data = get_collection("admission_status").get(ids=[STATUS_RECORD_ID])
+    if data["metadatas"]:
+        return data["metadatas"][0]
+    return None
+
+
+def _write_record(counters: dict):
+    metadata = {name: int(counters.get(name, 0)) for name in COUNTERS}
+    metadata["last_updated"] = datetime.now().isoformat()
+    get_collection("admission_status").upsert(
+        documents=[STATUS_RECORD_ID],
+        metadatas=[metadata],
+        ids=[STATUS_RECORD_ID]
+    )
+    return metadata
+
+
+def get_admission_status() -> dict:
+    """Return the dashboard counters (a single record read)."""
+    record = _read_record()
+    if record is None:
+        status = asdict(AdmissionProcessStatus())
+        status["last_updated"] = status["last_updated"].isoformat()
+        return status
+    return {name: record.get(name, 0) for name in COUNTERS} | {"last_updated": record.get("last_updated")}
+
+
+def apply_deltas(deltas: dict):
+    """Add deltas to the stored counters."""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    with _status_lock:
+        counters = _read_record() or {}
+        updated = {name: counters.get(name, 0) + deltas.get(name, 0) for name in COUNTERS}
+        _write_record(updated)
+
+
+def record_transitions(collection_name: str, transitions):
+    """Apply counter changes for many (old_status, new_status) pairs in a single write."""
+    totals = {}
+    for old_status, new_status in transitions:
+        for name, value in transition_delta(collection_name, old_status, new_status).items():
+            totals[name] = totals.get(name, 0) + value
+    apply_deltas(totals)
+
+
+def update_status(collection_name: str, record_id: str, new_status, **changes):
+    """
+    Move a record to new_status, stamp it as changed and keep the dashboard counters in sync.
+
+    Extra keyword fields are merged into the record metadata. Returns the updated metadata,
+    or None if the record does not exist.
+    """
+    new_status = STATUS_ENUMS[collection_name](new_status)
+    collection = get_collection(collection_name)
+    data = collection.get(ids=[record_id])
+    if not data["metadatas"]:
+        return None
+
+    metadata = data["metadatas"][0]
+    old_status = metadata.get("status")
+    metadata.update(changes)
+    metadata.update(change_stamp())
+    metadata["status"] = new_status.value
+    collection.update(ids=[record_id], metadatas=[metadata])
+
+    record_transitions(collection_name, [(old_status, new_status)])
+    return metadata
+
+
+def update_statuses(collection_name: str, updates):
+    """
+    Bulk form of update_status for already-fetched records.
+
+    updates is a list of (metadata, new_status, changes) with metadata["id"] set; all records
+    are written in one update() and the counters in one adjustment. Returns the new metadatas.
+    """
+    enum = STATUS_ENUMS[collection_name]
+    stamp = change_stamp()
+    transitions, metadatas = [], []
+    for metadata, new_status, changes in updates:
+        new_status = enum(new_status)
+        transitions.append((metadata.get("status"), new_status))
+        updated = dict(metadata)
+        updated.update(changes or {})
+        updated.update(stamp)
+        updated["status"] = new_status.value
+        metadatas.append(updated)
+    if not metadatas:
+        return []
+
+    get_collection(collection_name).update(ids=[meta["id"] for meta in metadatas], metadatas=metadatas)
+    record_transitions(collection_name, transitions)
+    return metadatas
+
+
+def reconcile() -> dict:
+    """Recompute the counters from the source collections and overwrite any drift."""
+    with _status_lock:
+        actual = {name: 0 for name in COUNTERS}
+        for collection_name in STATUS_ENUMS:
+            collection = get_collection(collection_name)
+            offset = 0
+            while True:
+                page = collection.get(limit=RECONCILE_PAGE_SIZE, offset=offset, include=["metadatas"])
+                for metadata in page["metadatas"]:
+                    for name, value in contribution(collection_name, metadata.get("status")).items():
+                        actual[name] += value
+                if len(page["ids"]) < RECONCILE_PAGE_SIZE:
+                    break
+                offset += RECONCILE_PAGE_SIZE
+
+        stored = _read_record() or {}
+        drift = {name: actual[name] - stored.get(name, 0) for name in COUNTERS if actual[name] != stored.get(name, 0)}
+        _write_record(actual)
+    return {"counters": actual, "drift": drift}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admission dashboard counters.")
+    parser.add_argument("--reconcile", action="store_true", help="Recompute counters and fix drift.")
+    args = parser.parse_args()
+
+    if args.reconcile:
+        result = reconcile()
+        print(f"Reconciled counters: {result['counters']}")
+        print(f"Drift fixed: {result['drift'] or 'none'}")
+    else:
+        print(get_admission_status())
+
+
+if __name__ == "__main__":
+    main()
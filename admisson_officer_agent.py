@@ -1,15 +1,39 @@
-from crewai import Agent, Task
-from langchain.tools import Tool
-from backend.utils.gemini_client import get_gemini_client
+import json
+import time
+from crewai import Agent
+from backend.agents.agent_registry import TaskTemplate, agent_tool, get_crew_agent
+from backend.utils.llm_backend import get_llm_client, parse_json_response
+from backend.utils.prompt_encoding import TABLE_HINT, encode_for
+from backend.utils.prescreen import DEFAULT_CUTOFFS, prescreen_applications
+from backend.utils.metrics import instrument_tool
+from backend.data.admission_status import update_statuses
 from backend.data.database import get_collection
+from backend.data.model import ApplicationStatus
+from backend.data.watermark import changed_since, get_watermark, latest_change, next_watermark, set_watermark
+
+
+SCREENING_TASK = TaskTemplate(
+    description="""Screen all student applications and evaluate:
+            - Academic performance
+            - Completeness of the form
+            - Presence of mandatory fields and documents
+
+            Flag applications with missing info or weak credentials and recommend eligible ones.
+            """,
+    expected_output="A JSON list of screened applications with status: eligible/ineligible and reasoning."
+)
 
 
 class AdmissionOfficerAgent:
     def __init__(self):
-        self.gemini = get_gemini_client()
+        self.gemini = get_llm_client()
+        self.screening_cutoffs = DEFAULT_CUTOFFS
 
     def get_agent(self):
-        """Return the CrewAI agent responsible for screening admission applications."""
+        """Return the CrewAI agent responsible for screening admission applications (built once per process)."""
+        return get_crew_agent("admission_officer", self._build_agent)
+
+    def _build_agent(self):
         return Agent(
             role="Admission Officer",
             goal="Screen applications for eligibility based on academic criteria and application completeness.",
@@ -18,8 +42,9 @@ class AdmissionOfficerAgent:
             verbose=True,
             allow_delegation=False,
             tools=[
-                Tool.from_function(
-                    func=self.screen_applications,
+                agent_tool(
+                    "admission_officer",
+                    self.screen_applications,
                     name="ScreenApplications",
                     description="Screen applications for eligibility based on academic merit and application completeness."
                 )
@@ -28,52 +53,105 @@ class AdmissionOfficerAgent:
 
     def create_screening_task(self):
         """Create a task to screen submitted admission applications."""
-        return Task(
-            description="""Screen all student applications and evaluate:
-            - Academic performance
-            - Completeness of the form
-            - Presence of mandatory fields and documents
+        return SCREENING_TASK.bind(self.get_agent())
 
-            Flag applications with missing info or weak credentials and recommend eligible ones.
+    def screen_batch(self, applications):
+        """
+        Screen a list of application metadatas. Returns (decisions, complete).
+
+        Clear passes/fails are decided locally; only the borderline band goes to the LLM.
+        Borderline applications without a decision in the LLM answer (or all of them, if it could
+        not be read) get "needs_review" and complete is False.
+        """
+        decisions, borderline = prescreen_applications(applications, self.screening_cutoffs)
+        if not borderline:
+            return decisions, True
+
+        response = self.gemini.generate_content(
+            f"""You are screening the following student applications:
+
+            Each application includes:
+            - Student name
+            - Academic scores
+            - Income category
+            - List of submitted documents
+
+            Evaluate each application and return a JSON list like:
+            [
+              {{
+                "application_id": "...",
+                "student_name": "...",
+                "status": "eligible/ineligible",
+                "reason": "..."
+              }},
+              ...
+            ]
+
+            Applications ({TABLE_HINT}):
+            {encode_for("screening", borderline)}
             """,
-            expected_output="A JSON list of screened applications with status: eligible/ineligible and reasoning.",
-            agent=self.get_agent()
+            expect_json=True
         )
 
-    def screen_applications(self):
-        """Tool logic to screen applications for admission eligibility."""
+        reviewed = parse_json_response(response.text)
+        names = {app.get("id"): app.get("student_name", "") for app in borderline}
+        if isinstance(reviewed, list):
+            decided = {item.get("application_id"): item for item in reviewed
+                       if isinstance(item, dict) and item.get("application_id") in names}
+            reason = "Automated review returned no decision for this application."
+        else:
+            print(f"Unreadable screening response: {response.text}")
+            decided = {}
+            reason = "Automated review returned an unreadable response."
+
+        decisions.extend(decided.get(app_id) or {
+            "application_id": app_id,
+            "student_name": name,
+            "status": "needs_review",
+            "reason": reason
+        } for app_id, name in names.items())
+        return decisions, len(decided) == len(names)
+
+    def record_decisions(self, applications, decisions):
+        """
+        Save eligible/ineligible decisions as status changes. Returns the updated metadatas.
+
+        Applications without a clear decision (needs_review) stay "submitted", so the next run retries them.
+        """
+        decided = {d.get("application_id"): d for d in decisions if isinstance(d, dict)}
+        updates = []
+        for app in applications:
+            status = str(decided.get(app["id"], {}).get("status", "")).lower()
+            if status == "eligible":
+                updates.append((app, ApplicationStatus.UNDER_REVIEW, {"eligible": True}))
+            elif status == "ineligible":
+                updates.append((app, ApplicationStatus.REJECTED, {"eligible": False}))
+        return update_statuses("applications", updates)
+
+    @instrument_tool("admission_officer")
+    def screen_applications(self, *, full_rerun: bool = False):
+        """Tool logic to screen applications for admission eligibility.
+
+        Only applications changed since the last successful run are screened unless full_rerun is set.
+        Decisions are saved as status changes, so screened applications leave the "submitted" filter.
+        """
         try:
+            watermark = 0.0 if full_rerun else get_watermark("admission_officer")
+            started_at = time.time()
             application_collection = get_collection("applications")
-            applications = application_collection.get(where={"status": "submitted"})["metadatas"]
+            data = application_collection.get(where=changed_since({"status": "submitted"}, watermark))
+            applications = [dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"])]
 
             if not applications:
                 return "No applications to screen."
 
-            response = self.gemini.generate_content(
-                f"""You are screening the following student applications:
-
-                Each application includes:
-                - Student name
-                - Academic scores
-                - List of submitted documents
-
-                Evaluate each application and return a JSON list like:
-                [
-                  {{
-                    "application_id": "...",
-                    "student_name": "...",
-                    "status": "eligible/ineligible",
-                    "reason": "..."
-                  }},
-                  ...
-                ]
-
-                Applications:
-                {applications}
-                """
-            )
-
-            return response.text
+            decisions, complete = self.screen_batch(applications)
+            self.record_decisions(applications, decisions)
+            if complete:
+                set_watermark("admission_officer",
+                              next_watermark(watermark, latest_change(applications, watermark), started_at))
+
+            return json.dumps(decisions)
         except Exception as e:
             print(f"Error screening applications: {e}")
             return f"Error: {str(e)}"
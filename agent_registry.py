@@ -0,0 +1,66 @@
+# agent_registry.py (per-process cache of CrewAI agents and reusable task templates)
+
+import functools
+import threading
+
+from crewai import Task
+from crewai.tools import tool
+
+# One CrewAI Agent (with its tool wrappers) per role, built on first use
+_agents = {}
+_agents_lock = threading.Lock()
+
+
+def get_crew_agent(role: str, build):
+    """Return the cached CrewAI agent for a role, calling build() only the first time."""
+    agent = _agents.get(role)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(role)
+            if agent is None:
+                agent = build()
+                _agents[role] = agent
+    return agent
+
+
+def clear_agent_cache():
+    """Drop cached agents (e.g. after changing LLM configuration)."""
+    with _agents_lock:
+        _agents.clear()
+
+
+def agent_tool(role: str, method, name: str, description: str):
+    """
+    Wrap an agent method as a CrewAI tool.
+
+    The cached CrewAI Agent outlives the instance that built it, so the tool calls the method on
+    the process-wide agent for `role` (services.get_agent) instead of capturing `method`'s instance.
+    `method` only supplies the name and the argument schema.
+    """
+    @functools.wraps(method)
+    def run(*args, **kwargs):
+        from backend.utils.services import call_agent
+        return call_agent(role, method.__name__, *args, **kwargs)
+
+    run.__doc__ = description
+    return tool(name)(run)
+
+
+class TaskTemplate:
+    """
+    A task description with named placeholders, bound to per-request parameters on demand.
+
+    Tasks keep execution state, so every bind() returns a fresh Task, but the agent it runs
+    on and the template text are shared.
+    """
+
+    def __init__(self, description: str, expected_output: str):
+        self.description = description
+        self.expected_output = expected_output
+
+    def bind(self, agent, **params):
+        return Task(
+            description=self.description.format(**params) if params else self.description,
+            expected_output=self.expected_output,
+            agent=agent
+        )
@@ -0,0 +1,134 @@
+# analytics.py (aggregate reporting over the columnar snapshot)
+#
+# Every query works on whole NumPy columns from backend.data.snapshot: group-bys are bincounts
+# over dictionary codes, so results come back in milliseconds even for six-figure record counts.
+
+from functools import lru_cache
+
+import numpy as np
+
+from backend.data.model import ApplicationStatus
+from backend.data.snapshot import get_snapshot
+
+# Application statuses that count as accepted for acceptance rates
+ACCEPTED_STATUSES = [ApplicationStatus.SHORTLISTED, ApplicationStatus.ADMITTED, ApplicationStatus.FEE_SLIP_SENT]
+
+
+def _codes_in(table, column: str, values):
+    codes = [table.code_of(column, getattr(value, "value", value)) for value in values]
+    return np.isin(table.column(column), codes)
+
+
+def _grouped(table, column: str):
+    """(codes shifted so missing = last group, group labels) for a categorical column."""
+    categories = table.categories(column)
+    codes = np.asarray(table.column(column))
+    return np.where(codes < 0, len(categories), codes), categories + ["unknown"]
+
+
+def _round(value, digits=2):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def status_counts(collection_name: str, snapshot=None) -> dict:
+    """Number of records per status."""
+    table = (snapshot or get_snapshot())[collection_name]
+    groups, labels = _grouped(table, "status")
+    counts = np.bincount(groups, minlength=len(labels))
+    return {label: int(count) for label, count in zip(labels, counts) if count}
+
+
+def score_distribution(bins: int = 10, snapshot=None) -> dict:
+    """Histogram and percentiles of applicants' average 10th/12th marks."""
+    table = (snapshot or get_snapshot())["applications"]
+    scores = (np.asarray(table.column("marks_10")) + np.asarray(table.column("marks_12"))) / 2
+    scores = scores[~np.isnan(scores)]
+    if not scores.size:
+        return {"count": 0, "histogram": [], "percentiles": {}}
+
+    counts, edges = np.histogram(scores, bins=bins, range=(0, 100))
+    p25, p50, p75, p90 = np.percentile(scores, [25, 50, 75, 90])
+    return {
+        "count": int(scores.size),
+        "mean": _round(scores.mean()),
+        "histogram": [
+            {"from": _round(low), "to": _round(high), "count": int(count)}
+            for low, high, count in zip(edges[:-1], edges[1:], counts)
+        ],
+        "percentiles": {"p25": _round(p25), "p50": _round(p50), "p75": _round(p75), "p90": _round(p90)}
+    }
+
+
+def acceptance_by_income_category(snapshot=None) -> dict:
+    """Applications, accepted applications and acceptance rate per income category."""
+    table = (snapshot or get_snapshot())["applications"]
+    groups, labels = _grouped(table, "income_category")
+    accepted = _codes_in(table, "status", ACCEPTED_STATUSES)
+
+    totals = np.bincount(groups, minlength=len(labels))
+    accepted_totals = np.bincount(groups, weights=accepted, minlength=len(labels))
+    return {
+        label: {
+            "applications": int(total),
+            "accepted": int(accepted_count),
+            "acceptance_rate": round(float(accepted_count / total), 4)
+        }
+        for label, total, accepted_count in zip(labels, totals, accepted_totals) if total
+    }
+
+
+@lru_cache(maxsize=4)
+def _loan_income_groups(snapshot):
+    """Income category group of each loan's applicant, joined on student_id (cached per snapshot)."""
+    loans, applications = snapshot["loan_requests"], snapshot["applications"]
+    category_groups, category_labels = _grouped(applications, "income_category")
+    unknown = len(category_labels) - 1
+
+    # Income group per application student_id code, then translate loan codes into application codes
+    app_codes = np.asarray(applications.column("student_id"))
+    group_by_app_code = np.full(len(applications.categories("student_id")) + 1, unknown)
+    group_by_app_code[app_codes[app_codes >= 0]] = category_groups[app_codes >= 0]
+    app_code_of = {student_id: code for code, student_id in enumerate(applications.categories("student_id"))}
+    translate = np.array([app_code_of.get(student_id, -1) for student_id in loans.categories("student_id")] + [-1],
+                         dtype=np.int64)
+    return group_by_app_code[translate[np.asarray(loans.column("student_id"))]], category_labels
+
+
+def loan_totals(snapshot=None) -> dict:
+    """Loan counts and requested/approved amounts per status and per applicant income category."""
+    snapshot = snapshot or get_snapshot()
+    loans = snapshot["loan_requests"]
+    requested = np.nan_to_num(np.asarray(loans.column("amount_requested")))
+    approved = np.nan_to_num(np.asarray(loans.column("approved_amount")))
+
+    def summarize(groups, labels):
+        counts = np.bincount(groups, minlength=len(labels))
+        requested_sums = np.bincount(groups, weights=requested, minlength=len(labels))
+        approved_sums = np.bincount(groups, weights=approved, minlength=len(labels))
+        return {
+            label: {"loans": int(count), "requested": _round(req), "approved": _round(appr)}
+            for label, count, req, appr in zip(labels, counts, requested_sums, approved_sums) if count
+        }
+
+    loan_categories, category_labels = _loan_income_groups(snapshot)
+    status_groups, status_labels = _grouped(loans, "status")
+    return {
+        "loans": int(loans.rows),
+        "requested": _round(requested.sum()),
+        "approved": _round(approved.sum()),
+        "by_status": summarize(status_groups, status_labels),
+        "by_income_category": summarize(loan_categories, category_labels)
+    }
+
+
+def overview(snapshot=None) -> dict:
+    """All reports in one call, with snapshot age so callers know how fresh the numbers are."""
+    snapshot = snapshot or get_snapshot()
+    return {
+        "snapshot_version": snapshot.version,
+        "snapshot_age_s": round(snapshot.age, 1),
+        "application_status": status_counts("applications", snapshot),
+        "scores": score_distribution(snapshot=snapshot),
+        "acceptance_by_income_category": acceptance_by_income_category(snapshot),
+        "loans": loan_totals(snapshot)
+    }
@@ -0,0 +1,109 @@
+# async_exec.py (async execution layer for blocking LLM and ChromaDB calls)
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from backend.utils.llm_backend import get_llm_client
+
+# Concurrency limits for blocking work offloaded from the event loop
+AGENT_CONCURRENCY = int(os.environ.get("AGENT_CONCURRENCY", "8"))
+CHROMA_CONCURRENCY = int(os.environ.get("CHROMA_CONCURRENCY", "8"))
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+BULK_CONCURRENCY = int(os.environ.get("BULK_CONCURRENCY", "2"))
+
+# One bounded pool per kind of work so slow LLM calls cannot starve Chroma reads, and
+# long collection-wide operations (imports, snapshot rebuilds) cannot starve either
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """Get or create the bounded thread pool for a kind of blocking work (agent, chroma, llm, bulk)."""
+    with _executors_lock:
+        if kind not in _executors:
+            limits = {"agent": AGENT_CONCURRENCY, "chroma": CHROMA_CONCURRENCY, "llm": LLM_CONCURRENCY,
+                      "bulk": BULK_CONCURRENCY}
+            _executors[kind] = ThreadPoolExecutor(max_workers=limits[kind], thread_name_prefix=f"{kind}-worker")
+        return _executors[kind]
+
+
+async def run_in_pool(kind: str, func, *args, **kwargs):
+    """Run a blocking callable on the named pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(kind), partial(func, *args, **kwargs))
+
+
+async def run_agent(func, *args, **kwargs):
+    """Run a synchronous agent method (LLM + Chroma) off the event loop."""
+    return await run_in_pool("agent", func, *args, **kwargs)
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a synchronous ChromaDB call off the event loop."""
+    return await run_in_pool("chroma", func, *args, **kwargs)
+
+
+async def run_bulk(func, *args, **kwargs):
+    """Run a long collection-wide operation (bulk import, snapshot rebuild, reconcile) off the event loop."""
+    return await run_in_pool("bulk", func, *args, **kwargs)
+
+
+class AsyncLLMClient:
+    """Async facade over the configured LLM client."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        # Resolved per call so set_llm_client() overrides are honoured
+        return self._client or get_llm_client()
+
+    async def generate_content(self, prompt, **kwargs):
+        # Prefer the client's native coroutine (Gemini SDK and local backend both provide one)
+        native = getattr(self.client, "generate_content_async", None)
+        if native is not None:
+            return await native(prompt, **kwargs)
+        return await run_in_pool("llm", self.client.generate_content, prompt, **kwargs)
+
+    async def stream_content(self, prompt, **kwargs):
+        """Yield response chunks as they arrive, without blocking the event loop."""
+        response = await self.generate_content(prompt, stream=True, **kwargs)
+        if hasattr(response, "__aiter__"):
+            async for chunk in response:
+                yield chunk
+            return
+        # Clients without a native async stream: pull each chunk on the llm pool
+        chunks = iter(response)
+        while True:
+            chunk = await run_in_pool("llm", next, chunks, _END)
+            if chunk is _END:
+                return
+            yield chunk
+
+
+# Marks the end of a synchronous stream pulled through the llm pool
+_END = object()
+
+_async_llm_client = None
+
+
+def get_async_llm_client():
+    """Return the process-wide async LLM client."""
+    global _async_llm_client
+
+    if _async_llm_client is None:
+        _async_llm_client = AsyncLLMClient()
+
+    return _async_llm_client
+
+
+def shutdown_executors():
+    """Stop all worker pools (called on application shutdown)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
@@ -0,0 +1,387 @@
+# benchmark.py
+#
+# Offline benchmark suite for the admission agents.
+# Seeds a throwaway ChromaDB with synthetic students/applications/loans, swaps the
+# Gemini client for the local LLM backend and reports cost per agent tool.
+#
+# Usage:
+#   python benchmark.py --applicants 1000
+#   python benchmark.py --applicants 5000 --latency 0.2 --json results.json
+#   python benchmark.py --suite collections
+#   python benchmark.py --suite embeddings --applicants 20000
+#   python benchmark.py --suite tasks --iterations 200
+#   python benchmark.py --suite startup --runs 3
+#   python benchmark.py --suite prompts --applicants 1000
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+INCOME_CATEGORIES = ["General", "OBC", "SC/ST", "EWS"]
+REQUIRED_DOCUMENTS = ["identity_proof", "transcripts", "residence_proof", "photo", "income_certificate"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Rohan", "Sara", "Vikram", "Ananya", "Kabir", "Nisha"]
+LAST_NAMES = ["Sharma", "Ghosh", "Iyer", "Das", "Patel", "Khan", "Reddy", "Bose", "Mehta", "Singh"]
+
+# Chroma rejects very large single add() calls
+SEED_BATCH_SIZE = 1000
+
+
+def synthetic_records(n: int, seed: int = 42):
+    """Generate n (student, application, loan) metadata triples shaped like studentinput.py writes them."""
+    rng = random.Random(seed)
+    base = datetime(2026, 5, 1)
+
+    for i in range(n):
+        student_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        app_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        loan_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+        submitted_at = base + timedelta(minutes=i)
+        submitted = submitted_at.isoformat()
+        documents = [doc for doc in REQUIRED_DOCUMENTS if rng.random() > 0.1]
+
+        student = {
+            "id": student_id,
+            "name": name,
+            "email": f"student{i}@example.com",
+            "phone": f"9{rng.randint(100000000, 999999999)}",
+            "biometric": "",
+            "application_id": app_id,
+            "communication_history": ""
+        }
+        application = {
+            "id": app_id,
+            "student_id": student_id,
+            "student_name": name,
+            "submission_date": submitted,
+            "status": "submitted",
+            "eligible": False,
+            "marks_10": rng.randint(35, 100),
+            "marks_12": rng.randint(35, 100),
+            "aadhar_no": str(rng.randint(10 ** 11, 10 ** 12 - 1)),
+            "income_category": rng.choice(INCOME_CATEGORIES),
+            "documents": ",".join(documents),
+            "updated_on": submitted,
+            "updated_ts": submitted_at.timestamp()
+        }
+        loan = {
+            "id": loan_id,
+            "student_id": student_id,
+            "amount_requested": float(rng.randrange(10000, 300000, 1000)),
+            "purpose": "Tuition fees",
+            "status": "requested",
+            "evaluation_notes": "",
+            "evaluated_by": "",
+            "decision_date": "",
+            "updated_on": submitted,
+            "updated_ts": submitted_at.timestamp()
+        }
+        yield student, application, loan
+
+
+def seed_database(n: int, seed: int = 42, loan_budget: float = 5_000_000.0):
+    """Populate the configured ChromaDB with n synthetic applicants. Returns (student_ids, application_ids)."""
+    from backend.data.database import get_collection, initialize_collections
+
+    initialize_collections()
+    batches = {"students": [], "applications": [], "loan_requests": []}
+    student_ids, application_ids = [], []
+
+    def flush():
+        for name, metadatas in batches.items():
+            if metadatas:
+                ids = [meta["id"] for meta in metadatas]
+                get_collection(name).add(documents=ids, metadatas=metadatas, ids=ids)
+                metadatas.clear()
+
+    for student, application, loan in synthetic_records(n, seed):
+        batches["students"].append(student)
+        batches["applications"].append(application)
+        batches["loan_requests"].append(loan)
+        student_ids.append(student["id"])
+        application_ids.append(application["id"])
+        if len(batches["students"]) >= SEED_BATCH_SIZE:
+            flush()
+    flush()
+
+    get_collection("university_budget").upsert(
+        documents=["loan_budget"],
+        metadatas=[{"type": "loan", "remaining_budget": loan_budget}],
+        ids=["loan_budget"]
+    )
+    return student_ids, application_ids
+
+
+def measure(llm, name, func, *args):
+    """Run func once and return its wall time and LLM usage delta."""
+    before = llm.stats()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    after = llm.stats()
+    return {
+        "tool": name,
+        "wall_s": elapsed,
+        "llm_calls": after["calls"] - before["calls"],
+        "prompt_bytes": after["prompt_bytes"] - before["prompt_bytes"],
+        "response_bytes": after["response_bytes"] - before["response_bytes"],
+    }
+
+
+def combine(name, runs):
+    """Sum a list of measure() results into a single row."""
+    row = {"tool": name, "wall_s": 0.0, "llm_calls": 0, "prompt_bytes": 0, "response_bytes": 0}
+    for run in runs:
+        for key in ("wall_s", "llm_calls", "prompt_bytes", "response_bytes"):
+            row[key] += run[key]
+    row["runs"] = len(runs)
+    return row
+
+
+def bench_agents(args, llm):
+    """Run each agent tool against the seeded database and return one row per tool."""
+    from backend.agents.admisson_officer_agent import AdmissionOfficerAgent
+    from backend.agents.document_checking_agent import DocumentCheckingAgent
+    from backend.agents.shortlisting_agent import ShortlistingAgent
+    from backend.agents.student_counsellor import StudentCounsellorAgent
+    from backend.agents.studen_loan_agent import StudentLoanAgent
+
+    student_ids, application_ids = seed_database(args.applicants, args.seed)
+    sample = min(args.sample, args.applicants)
+
+    officer = AdmissionOfficerAgent()
+    shortlister = ShortlistingAgent()
+    checker = DocumentCheckingAgent()
+    loan_agent = StudentLoanAgent()
+    counsellor = StudentCounsellorAgent()
+
+    rows = [
+        measure(llm, "screen_applications", officer.screen_applications),
+        measure(llm, "shortlist_applications", shortlister.shortlist_applications),
+        measure(llm, "process_loan_requests", loan_agent.process_loan_requests),
+    ]
+    # Per-applicant tools are sampled and scaled to the full cohort in the report
+    rows.append(combine("verify_documents", [
+        measure(llm, "verify_documents", checker.verify_documents, app_id)
+        for app_id in application_ids[:sample]
+    ]))
+    rows.append(combine("communicate_with_student", [
+        measure(llm, "communicate_with_student", counsellor.communicate_with_student, student_id, "shortlisted")
+        for student_id in student_ids[:sample]
+    ]))
+
+    for row in rows:
+        covered = row.get("runs", args.applicants)
+        scale = 1000.0 / covered
+        row["wall_s_per_1k"] = row["wall_s"] * scale
+        row["llm_calls_per_1k"] = row["llm_calls"] * scale
+        row["prompt_bytes_per_1k"] = row["prompt_bytes"] * scale
+    return rows
+
+
+def bench_collections(args, llm):
+    """Per-call overhead of resolving a collection handle, uncached vs cached."""
+    from backend.data.database import get_collection, get_db_client, initialize_collections
+
+    initialize_collections()
+    client = get_db_client()
+    names = ["students", "applications", "loan_requests"]
+    rows = []
+
+    for label, resolve in (
+        ("get_or_create_collection", lambda name: client.get_or_create_collection(name=name)),
+        ("get_collection (cached)", get_collection),
+    ):
+        start = time.perf_counter()
+        for i in range(args.iterations):
+            resolve(names[i % len(names)])
+        elapsed = time.perf_counter() - start
+        rows.append({"tool": label, "wall_s": elapsed, "us_per_call": elapsed / args.iterations * 1e6})
+    return rows
+
+
+def bench_embeddings(args, llm):
+    """Insert throughput of structured records with the default embedding vs metadata-only storage."""
+    from backend.data.database import MetadataOnlyEmbeddingFunction, get_db_client
+
+    client = get_db_client()
+    _, applications, _ = zip(*synthetic_records(args.applicants, args.seed))
+    rows = []
+
+    for label, kwargs in (
+        ("default_embedding", {}),
+        ("metadata_only", {"embedding_function": MetadataOnlyEmbeddingFunction()}),
+    ):
+        collection = client.get_or_create_collection(name=f"bench_{label}", **kwargs)
+        start = time.perf_counter()
+        for offset in range(0, len(applications), SEED_BATCH_SIZE):
+            batch = applications[offset:offset + SEED_BATCH_SIZE]
+            ids = [meta["id"] for meta in batch]
+            collection.add(documents=ids, metadatas=list(batch), ids=ids)
+        elapsed = time.perf_counter() - start
+        client.delete_collection(name=f"bench_{label}")
+        rows.append({"tool": label, "wall_s": elapsed, "records_per_s": len(applications) / elapsed})
+    return rows
+
+
+def bench_tasks(args, llm):
+    """Cost of building a CrewAI task per request: fresh Agent each time vs the cached registry."""
+    from backend.agents.admisson_officer_agent import SCREENING_TASK, AdmissionOfficerAgent
+    from backend.agents.student_counsellor import COMMUNICATION_TASK, StudentCounsellorAgent
+
+    officer = AdmissionOfficerAgent()
+    counsellor = StudentCounsellorAgent()
+    cases = [
+        ("screening_task (rebuild agent)", lambda i: SCREENING_TASK.bind(officer._build_agent())),
+        ("screening_task (cached agent)", lambda i: officer.create_screening_task()),
+        ("communication_task (rebuild agent)",
+         lambda i: COMMUNICATION_TASK.bind(counsellor._build_agent(), student_id=str(i), admission_stage="shortlisted")),
+        ("communication_task (cached agent)", lambda i: counsellor.create_communication_task(str(i), "shortlisted")),
+    ]
+    rows = []
+    for label, build in cases:
+        start = time.perf_counter()
+        for i in range(args.iterations):
+            build(i)
+        elapsed = time.perf_counter() - start
+        rows.append({"tool": label, "wall_s": elapsed, "us_per_call": elapsed / args.iterations * 1e6})
+    return rows
+
+
+def bench_prompts(args, llm):
+    """Prompt tokens per bulk prompt: repr() of full metadata dicts vs the compact tabular encoding."""
+    from backend.utils.prompt_encoding import PROMPT_FIELDS, token_savings
+
+    _, applications, loans = zip(*synthetic_records(args.applicants, args.seed))
+    loan_summaries = [
+        {"loan_id": loan["id"], "status": "approved", "approved_amount": loan["amount_requested"], "need_score": 0.5}
+        for loan in loans
+    ]
+    cases = [
+        ("screen_applications", "screening", applications),
+        ("shortlist_applications", "shortlisting", applications),
+        ("process_loan_requests", "loan_reasons", loan_summaries),
+    ]
+    rows = []
+    for tool, prompt, records in cases:
+        start = time.perf_counter()
+        savings = token_savings(list(records), PROMPT_FIELDS[prompt])
+        rows.append({"tool": tool, "wall_s": time.perf_counter() - start, **savings})
+    return rows
+
+
+# Run in a fresh interpreter so module import caches are cold
+STARTUP_PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get("/admission/status")
+    first_request = time.perf_counter()
+    while client.get("/ready").status_code != 200 and time.perf_counter() - first_request < 120:
+        time.sleep(0.05)
+    warmed = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_request_s": first_request - ready,
+    "warm_up_s": warmed - ready,
+}))
+"""
+
+
+def bench_startup(args, llm):
+    """Cold import of main.py, first request latency and background warm-up time."""
+    import subprocess
+    import sys
+
+    rows = []
+    for run in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        )
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        rows.append({"tool": f"startup run {run + 1}", "wall_s": sum(timings.values()), **timings})
+    return rows
+
+
+# Benchmark suites selectable with --suite
+SUITES = {
+    "agents": bench_agents,
+    "collections": bench_collections,
+    "embeddings": bench_embeddings,
+    "tasks": bench_tasks,
+    "prompts": bench_prompts,
+    "startup": bench_startup,
+}
+
+
+def print_table(rows):
+    columns = ["tool", "wall_s", "llm_calls", "prompt_bytes", "wall_s_per_1k", "llm_calls_per_1k", "prompt_bytes_per_1k"]
+    present = [col for col in columns if any(col in row for row in rows)]
+    extra = sorted({key for row in rows for key in row} - set(columns) - {"runs", "response_bytes"})
+    present += extra
+    print(" | ".join(f"{col:>22}" for col in present))
+    for row in rows:
+        cells = []
+        for col in present:
+            value = row.get(col, "")
+            cells.append(f"{value:>22.4f}" if isinstance(value, float) else f"{str(value):>22}")
+        print(" | ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark admission agents against the local LLM backend.")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="agents")
+    parser.add_argument("--applicants", type=int, default=1000, help="Number of synthetic applicants to seed.")
+    parser.add_argument("--sample", type=int, default=100, help="Applicants to run per-applicant tools against.")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations for micro-benchmarks.")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions for the startup suite.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated LLM latency per call (seconds).")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Simulated LLM output rate (0 = instant).")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of an injected LLM failure.")
+    parser.add_argument("--db-path", default=None, help="ChromaDB directory (defaults to a temporary directory).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args()
+
+    # Must be set before backend.data.database is imported
+    db_path = args.db_path or tempfile.mkdtemp(prefix="admission_bench_")
+    os.environ["CHROMA_DB_PATH"] = db_path
+    os.environ["LLM_BACKEND"] = "local"
+
+    from backend.utils.llm_backend import LocalLLMBackend, set_llm_client
+
+    llm = LocalLLMBackend(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_sec,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    set_llm_client(llm)
+
+    rows = SUITES[args.suite](args, llm)
+    print_table(rows)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "suite": args.suite,
+                "applicants": args.applicants,
+                "db_path": db_path,
+                "generated_at": datetime.now().isoformat(),
+                "results": rows,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# bulk_ingest.py (streaming CSV/JSONL importer for partner-college applicant batches)
+#
+# Usage:
+#   python -m backend.data.bulk_ingest applicants.csv
+#   python -m backend.data.bulk_ingest applicants.jsonl --batch-size 2000 --restart
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+
+from backend.data.database import get_collection, get_db_client, initialize_collections
+from backend.data.model import Application, ApplicationStatus, LoanRequest, LoanStatus, Student
+from backend.data.student_index import get_student_index
+from backend.data.watermark import change_stamp
+from backend.data.admission_status import record_transitions
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Namespace for deterministic ids, so re-importing the same file finds its records instead of duplicating them
+INGEST_NAMESPACE = uuid.UUID("6f1c1e0a-3a4b-4d7e-9a51-2b8f0c7d5e11")
+
+# Only the first errors are kept in the summary; the count is always exact
+MAX_REPORTED_ERRORS = 100
+
+
+class RowValidationError(ValueError):
+    """Raised when an input row cannot be turned into valid model objects."""
+
+
+def read_rows(path: str):
+    """Stream rows from a CSV or JSONL file as (line_number, dict) pairs."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, RowValidationError(f"Invalid JSON: {e}")
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            # Header is line 1, so data rows start at line 2
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+
+
+def _number(row, key, default=None, low=None, high=None):
+    value = row.get(key)
+    if value in (None, ""):
+        if default is None:
+            raise RowValidationError(f"'{key}' is required")
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RowValidationError(f"'{key}' must be a number, got {value!r}")
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise RowValidationError(f"'{key}' must be between {low} and {high}, got {number:g}")
+    return number
+
+
+def _text(row, key):
+    return str(row.get(key) or "").strip()
+
+
+def validate_row(row: dict, row_key: str):
+    """
+    Validate one flat input row against the model dataclasses.
+
+    Returns (Student, Application, LoanRequest or None, extra application fields).
+    """
+    if isinstance(row, Exception):
+        raise row
+
+    name, email = _text(row, "name"), _text(row, "email")
+    if not name:
+        raise RowValidationError("'name' is required")
+    if "@" not in email:
+        raise RowValidationError(f"'email' is not valid: {email!r}")
+
+    student_id = _text(row, "student_id") or str(uuid.uuid5(INGEST_NAMESPACE, f"{row_key}:student"))
+    app_id = _text(row, "application_id") or str(uuid.uuid5(INGEST_NAMESPACE, f"{row_key}:application"))
+
+    student = Student(id=student_id, name=name, email=email, phone=_text(row, "phone"), applications=[app_id])
+    application = Application(id=app_id, student_id=student_id, status=ApplicationStatus.SUBMITTED)
+    academics = {
+        "marks_10": _number(row, "marks_10", low=0, high=100),
+        "marks_12": _number(row, "marks_12", low=0, high=100),
+        "aadhar_no": _text(row, "aadhar_no"),
+        "income_category": _text(row, "income_category"),
+    }
+
+    loan = None
+    amount = _number(row, "loan_amount", default=0.0, low=0)
+    if amount > 0:
+        loan = LoanRequest(
+            id=_text(row, "loan_id") or str(uuid.uuid5(INGEST_NAMESPACE, f"{row_key}:loan")),
+            student_id=student_id,
+            amount_requested=amount,
+            purpose=_text(row, "loan_purpose"),
+            status=LoanStatus.REQUESTED,
+        )
+    return student, application, loan, {**academics, "biometric": _text(row, "biometric")}
+
+
+def to_metadatas(student, application, loan, extra):
+    """Flatten validated models into the metadata shapes studentinput.py writes."""
+    stamp = change_stamp()
+    student_meta = {
+        "id": student.id,
+        "name": student.name,
+        "email": student.email,
+        "phone": student.phone,
+        "biometric": extra["biometric"],
+        "application_id": application.id,
+        "communication_history": ""
+    }
+    application_meta = {
+        "id": application.id,
+        "student_id": student.id,
+        "student_name": student.name,
+        "submission_date": application.submission_date.isoformat(),
+        "status": application.status.value,
+        "eligible": application.eligible,
+        "marks_10": extra["marks_10"],
+        "marks_12": extra["marks_12"],
+        "aadhar_no": extra["aadhar_no"],
+        "income_category": extra["income_category"],
+        **stamp
+    }
+    loan_meta = None
+    if loan is not None:
+        loan_meta = {
+            "id": loan.id,
+            "student_id": student.id,
+            "amount_requested": loan.amount_requested,
+            "purpose": loan.purpose,
+            "status": loan.status.value,
+            "evaluation_notes": "",
+            "evaluated_by": "",
+            "decision_date": "",
+            **stamp
+        }
+    return student_meta, application_meta, loan_meta
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of the file contents; the default source key, so ids depend on content rather than name."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checkpoint_path(path: str) -> str:
+    return f"{path}.checkpoint.json"
+
+
+def _load_checkpoint(path: str):
+    try:
+        with open(checkpoint_path(path)) as f:
+            return json.load(f).get("line_number", 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _save_checkpoint(path: str, line_number: int, summary: dict):
+    tmp = checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"line_number": line_number, "summary": summary, "saved_at": datetime.now().isoformat()}, f)
+    os.replace(tmp, checkpoint_path(path))
+
+
+def ingest_file(path: str, batch_size: int = DEFAULT_BATCH_SIZE, resume: bool = True,
+                progress=None, source_key: str = None):
+    """
+    Stream a CSV/JSONL applicant file into the students, applications and loan_requests collections.
+
+    Rows are validated, buffered and written with one add per collection per batch.
+    After each batch a checkpoint is written next to the file, so an interrupted import
+    resumes after the last committed row. Ids are derived from source_key (by default a hash
+    of the file contents) and the line, and records whose id already exists are skipped rather
+    than overwritten, so replaying a file never resets applications that have progressed.
+    """
+    initialize_collections()
+    max_batch = getattr(get_db_client(), "get_max_batch_size", lambda: batch_size)()
+    batch_size = max(1, min(batch_size, max_batch))
+    source_key = source_key or file_digest(path)
+
+    start_after = _load_checkpoint(path) if resume else 0
+    summary = {"rows": 0, "ingested": 0, "loans": 0, "existing": 0, "failed": 0, "skipped": 0, "errors": []}
+    batch = {"students": [], "applications": [], "loan_requests": []}
+    last_line = start_after
+
+    def flush():
+        fresh = {}
+        for name, metadatas in batch.items():
+            unique = {}
+            for meta in metadatas:
+                unique.setdefault(meta["id"], meta)
+            collection = get_collection(name)
+            existing = set(collection.get(ids=list(unique), include=[])["ids"]) if unique else set()
+            fresh[name] = [meta for record_id, meta in unique.items() if record_id not in existing]
+            if fresh[name]:
+                ids = [meta["id"] for meta in fresh[name]]
+                collection.add(documents=ids, metadatas=fresh[name], ids=ids)
+                if name in ("applications", "loan_requests"):
+                    record_transitions(name, [(None, meta["status"]) for meta in fresh[name]])
+        get_student_index().add_students(fresh["students"])
+        summary["ingested"] += len(fresh["applications"])
+        summary["loans"] += len(fresh["loan_requests"])
+        summary["existing"] += len(batch["applications"]) - len(fresh["applications"])
+        for metadatas in batch.values():
+            metadatas.clear()
+        _save_checkpoint(path, last_line, {k: v for k, v in summary.items() if k != "errors"})
+        if progress:
+            progress(summary)
+
+    for line_number, row in read_rows(path):
+        if line_number <= start_after:
+            summary["skipped"] += 1
+            continue
+        summary["rows"] += 1
+        last_line = line_number
+        try:
+            student, application, loan = to_metadatas(*validate_row(row, f"{source_key}:{line_number}"))
+        except RowValidationError as e:
+            summary["failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({"line": line_number, "error": str(e)})
+            continue
+
+        batch["students"].append(student)
+        batch["applications"].append(application)
+        if loan:
+            batch["loan_requests"].append(loan)
+        if len(batch["applications"]) >= batch_size:
+            flush()
+
+    flush()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import applicants from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (with header) or JSONL file of applicant rows.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the top.")
+    parser.add_argument("--batch-id", help="Explicit source key for record ids (default: hash of the file contents).")
+    args = parser.parse_args()
+
+    def report(summary):
+        print(f"Ingested {summary['ingested']} applications ({summary['loans']} loans), "
+              f"{summary['existing']} already present, {summary['failed']} failed rows", flush=True)
+
+    summary = ingest_file(args.path, batch_size=args.batch_size, resume=not args.restart, progress=report,
+                          source_key=args.batch_id)
+    for error in summary["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+    print(f"Done: {summary['rows']} rows read, {summary['skipped']} skipped from checkpoint.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# chat_stream.py (token streaming for the admission chatbot)
+
+import json
+import threading
+import time
+from collections import deque
+
+from backend.data.database import get_collection
+from backend.utils.async_exec import get_async_llm_client, run_db
+from backend.utils.llm_backend import get_llm_client
+from backend.utils.metrics import CHAT_DURATION, CHAT_TTFT
+
+# Recent latency samples (seconds) for /chat/metrics; the same values go to the CHAT_* histograms
+_ttft_samples = deque(maxlen=1000)
+_total_samples = deque(maxlen=1000)
+_samples_lock = threading.Lock()
+
+
+def build_chat_prompt(content: str, application: dict = None) -> str:
+    """Prompt for a free-form admission question, with the applicant's record when known."""
+    context = f"\nApplicant record:\n{application}\n" if application else ""
+    return f"""You are a friendly university admission assistant.
+    Answer the student's question clearly and briefly. If you are unsure, say so and
+    suggest contacting the admissions office.
+    {context}
+    Question: {content}
+    """
+
+
+def _load_application(application_id: str = None):
+    if not application_id:
+        return None
+    metadatas = get_collection("applications").get(ids=[application_id])["metadatas"]
+    return metadatas[0] if metadatas else None
+
+
+def _record_latency(samples, histogram, start: float, mode: str):
+    elapsed = time.perf_counter() - start
+    histogram.observe(elapsed, mode=mode)
+    with _samples_lock:
+        samples.append(elapsed)
+
+
+def stream_chat(content: str, application_id: str = None):
+    """Yield the answer text chunk by chunk as the LLM produces it, recording time-to-first-token."""
+    prompt = build_chat_prompt(content, _load_application(application_id))
+
+    start = time.perf_counter()
+    first_token = True
+    for chunk in get_llm_client().generate_content(prompt, stream=True):
+        text = getattr(chunk, "text", "")
+        if not text:
+            continue
+        if first_token:
+            first_token = False
+            _record_latency(_ttft_samples, CHAT_TTFT, start, "sync")
+        yield text
+
+    _record_latency(_total_samples, CHAT_DURATION, start, "sync")
+
+
+async def astream_chat(content: str, application_id: str = None):
+    """Async variant of stream_chat for the API: chunks are awaited on the event loop, not a thread."""
+    prompt = build_chat_prompt(content, await run_db(_load_application, application_id))
+
+    start = time.perf_counter()
+    first_token = True
+    async for chunk in get_async_llm_client().stream_content(prompt):
+        text = getattr(chunk, "text", "")
+        if not text:
+            continue
+        if first_token:
+            first_token = False
+            _record_latency(_ttft_samples, CHAT_TTFT, start, "async")
+        yield text
+
+    _record_latency(_total_samples, CHAT_DURATION, start, "async")
+
+
+async def sse_chat_events(content: str, application_id: str = None):
+    """Server-sent events for /chat: one "token" event per chunk, then "done" (or "error")."""
+    try:
+        async for text in astream_chat(content, application_id):
+            yield f"data: {json.dumps({'token': text})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        print(f"Error streaming chat response: {e}")
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def chat_latency_stats():
+    """p50/p95 time-to-first-token and total response time (milliseconds) over recent chats."""
+    with _samples_lock:
+        ttft, total = list(_ttft_samples), list(_total_samples)
+    to_ms = lambda value: None if value is None else round(value * 1000, 1)
+    return {
+        "samples": len(ttft),
+        "ttft_p50_ms": to_ms(_percentile(ttft, 0.5)),
+        "ttft_p95_ms": to_ms(_percentile(ttft, 0.95)),
+        "total_p50_ms": to_ms(_percentile(total, 0.5)),
+        "total_p95_ms": to_ms(_percentile(total, 0.95)),
+    }
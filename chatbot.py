@@ -1,21 +1,17 @@
 import streamlit as st
-from backend.agents.student_counsellor import StudentCounsellorAgent
-from backend.agents.studen_loan_agent import StudentLoanAgent
-from backend.agents.admisson_officer_agent import AdmissionOfficerAgent
 from backend.data.database import get_collection
+from backend.data.student_index import get_student_index
+from backend.utils.chat_stream import stream_chat
+from backend.utils.intent_router import route_intent
+from backend.utils.services import get_agent
 
-# Initialize agents
-counsellor = StudentCounsellorAgent()
-loan_agent = StudentLoanAgent()
-officer = AdmissionOfficerAgent()
-
-# Retrieve student metadata by name
+# Retrieve student metadata by name (index lookup, then a single-id fetch)
 def get_student_metadata_by_name(name):
-    students = get_collection("students").get()
-    for idx, meta in enumerate(students.get("metadatas", [])):
-        if meta.get("name", "").lower() == name.lower():
-            return meta
-    return None
+    student_ids = get_student_index().find_by_name(name)
+    if not student_ids:
+        return None
+    metadatas = get_collection("students").get(ids=student_ids[:1])["metadatas"]
+    return metadatas[0] if metadatas else None
 
 # Main chatbot function
 def display_admission_chatbot(student_name=None):
@@ -39,25 +35,37 @@ def display_admission_chatbot(student_name=None):
             student_meta = get_student_metadata_by_name(student_name) if student_name else None
             student_id = student_meta.get("id") if student_meta else None
 
-            response = "I'm not sure how to help with that."
+            response = None
+            intent = route_intent(prompt)
 
-            if any(word in prompt.lower() for word in ["loan", "finance", "fee"]):
-                response = loan_agent.process_loan_request(student_id or "unknown", prompt).get("response")
+            if intent == "loan":
+                response = get_agent("loan_agent").process_loan_request(student_id or "unknown", prompt).get("response")
 
-            elif any(word in prompt.lower() for word in ["status", "stage", "progress"]):
-                task = counsellor.create_communication_task(student_id, "current stage")
+            elif intent == "status":
+                task = get_agent("student_counsellor").create_communication_task(student_id, "current stage")
                 response = task.execute().output if task else "Unable to retrieve your admission stage."
 
-            elif any(word in prompt.lower() for word in ["application", "overview", "report", "summary"]):
-                task = officer.create_overview_task()
+            elif intent == "overview":
+                task = get_agent("admission_officer").create_overview_task()
                 response = task.execute().output if task else "Unable to generate an admission summary."
 
-            elif any(word in prompt.lower() for word in ["bottleneck", "problem", "delay"]):
-                response = officer.detect_admission_bottlenecks()
+            elif intent == "bottleneck":
+                response = get_agent("admission_officer").detect_admission_bottlenecks()
 
-            elif any(word in prompt.lower() for word in ["message", "communicate", "talk"]):
-                response = counsellor.generate_communication_message(student_id, "application stage")
+            elif intent == "message":
+                response = get_agent("student_counsellor").generate_communication_message(student_id, "application stage")
 
-            st.session_state.chat_messages.append({"role": "assistant", "content": response})
-            with st.chat_message("assistant"):
+        with st.chat_message("assistant"):
+            if response is None:
+                # General questions are answered by the LLM directly and rendered as tokens arrive
+                try:
+                    application_id = student_meta.get("application_id") if student_meta else None
+                    response = st.write_stream(stream_chat(prompt, application_id))
+                except Exception as e:
+                    print(f"Error streaming chat response: {e}")
+                    response = "I'm not sure how to help with that."
+                    st.markdown(response)
+            else:
                 st.markdown(response)
+
+        st.session_state.chat_messages.append({"role": "assistant", "content": response})
@@ -0,0 +1,46 @@
+# chunking.py (token-budgeted batching and bounded parallel LLM dispatch)
+
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.utils.llm_backend import estimate_tokens
+
+
+def chunk_by_token_budget(records, token_budget: int, serialize=repr):
+    """
+    Split records into consecutive batches whose serialized size stays within token_budget.
+
+    A single record larger than the budget is emitted as its own batch rather than dropped.
+    """
+    chunk, used = [], 0
+    for record in records:
+        cost = estimate_tokens(serialize(record))
+        if chunk and used + cost > token_budget:
+            yield chunk
+            chunk, used = [], 0
+        chunk.append(record)
+        used += cost
+    if chunk:
+        yield chunk
+
+
+def dispatch_chunks(chunks, func, max_workers: int = 4):
+    """Run func over every chunk with a bounded thread pool. Results are returned in chunk order."""
+    chunks = list(chunks)
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [func(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        return list(pool.map(func, chunks))
+
+
+def merge_decisions(records, chunk_results, key="application_id", record_key="id"):
+    """
+    Flatten per-chunk decision lists into one list ordered like the input records.
+
+    Decisions whose key does not match any input record are kept at the end in arrival order.
+    """
+    position = {record.get(record_key): idx for idx, record in enumerate(records)}
+    decisions = [decision for result in chunk_results for decision in result]
+    return sorted(
+        decisions,
+        key=lambda decision: position.get(decision.get(key) if isinstance(decision, dict) else None, len(position))
+    )
@@ -1,35 +1,127 @@
 # database.py (ChromaDB version)
 
+import os
+import threading
 import chromadb
-from chromadb.api.types import Documents, Embeddings, Metadatas
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings, Metadatas
+
+from backend.utils.metrics import timed_chroma
+
+try:
+    from chromadb.utils.embedding_functions import register_embedding_function
+except ImportError:  # older chromadb without the embedding function registry
+    def register_embedding_function(cls):
+        return cls
 
 # Path to your ChromaDB persistent storage directory
-CHROMA_DB_PATH = "./chroma_db"
+CHROMA_DB_PATH = os.environ.get("CHROMA_DB_PATH", "./chroma_db")
+
+# Collections holding structured records. Their documents are just record ids and are never
+# searched semantically, so they skip the (expensive) default embedding model.
+METADATA_ONLY_COLLECTIONS = {
+    "students",
+    "applications",
+    "loan_requests",
+    "fee_slips",
+    "agents",
+    "admission_status",
+    "university_budget",
+    "communication_logs",
+}
 
 # Singleton to maintain a single database client
 _db_client = None
 
+# Per-process cache of collection handles, shared by the FastAPI worker threads
+_collections = {}
+_db_lock = threading.RLock()
+
+
+@register_embedding_function
+class MetadataOnlyEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Constant 1-d embedding for collections that are only filtered by metadata."""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [[0.0] for _ in input]
+
+    @staticmethod
+    def name() -> str:
+        return "metadata_only"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return MetadataOnlyEmbeddingFunction()
+
+
+def _open_collection(client, name: str):
+    """Get or create a collection, using metadata-only storage for structured collections."""
+    if name not in METADATA_ONLY_COLLECTIONS:
+        return client.get_or_create_collection(name=name)
+    try:
+        return client.get_or_create_collection(name=name, embedding_function=MetadataOnlyEmbeddingFunction())
+    except ValueError as e:
+        # Collection was created before metadata-only mode; keep using its persisted embedding function
+        print(f"Collection '{name}' keeps its existing embedding function: {e}")
+        return client.get_or_create_collection(name=name)
+
+
+class InstrumentedCollection:
+    """Collection handle that times every read/write operation (see backend.utils.metrics)."""
+
+    OPERATIONS = {"add", "count", "delete", "get", "peek", "query", "update", "upsert"}
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in self.OPERATIONS:
+            return attr
+
+        def timed(*args, **kwargs):
+            with timed_chroma(self._collection.name, name):
+                return attr(*args, **kwargs)
+        return timed
+
 
 def get_db_client():
     """Get or create a ChromaDB persistent client."""
     global _db_client
 
     if _db_client is None:
-        _db_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+        with _db_lock:
+            if _db_client is None:
+                _db_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
 
     return _db_client
 
 
 def get_collection(name: str):
-    """Get or create a collection by name."""
-    client = get_db_client()
-    return client.get_or_create_collection(name=name)
+    """Get or create a collection by name (handles are cached per process)."""
+    collection = _collections.get(name)
+    if collection is None:
+        with _db_lock:
+            collection = _collections.get(name)
+            if collection is None:
+                collection = InstrumentedCollection(_open_collection(get_db_client(), name))
+                _collections[name] = collection
+    return collection
+
+
+def reset_collection_cache():
+    """Forget cached collection handles (e.g. after collections are deleted or recreated)."""
+    with _db_lock:
+        _collections.clear()
 
 
 def initialize_collections():
     """Initialize required collections for student admission data."""
-    client = get_db_client()
-
     # Create necessary collections if they don't exist
     collections = [
         "students",
@@ -42,7 +134,10 @@ def initialize_collections():
         "admission_status"
     ]
 
+    # Structured collections are created in metadata-only mode (see METADATA_ONLY_COLLECTIONS).
+    # Refresh the handle cache so it stays valid across re-initialization
+    reset_collection_cache()
     for name in collections:
-        client.get_or_create_collection(name)
+        get_collection(name)
 
     print("ChromaDB collections initialized.")
@@ -0,0 +1,144 @@
+# decision_stream.py (incremental parsing of LLM decision lists into typed decisions)
+#
+# The scanner tracks brace depth and string state across chunks, so each top-level JSON object
+# is parsed as soon as its closing brace arrives. Prose, code fences and the surrounding list
+# brackets are skipped. A malformed object only produces a DecisionError for that item.
+
+import json
+from dataclasses import dataclass
+
+from backend.data.model import ApplicationStatus, Decision, LoanStatus
+
+# Statuses agents may return besides the application/loan lifecycle states
+DECISION_STATUSES = {"eligible", "ineligible", "not eligible", "not_eligible", "needs_review"}
+
+
+@dataclass
+class DecisionError:
+    """A fragment of LLM output that could not be turned into a Decision."""
+    index: int
+    fragment: str
+    error: str
+
+
+def _allowed_statuses():
+    return {status.value for status in ApplicationStatus} | {status.value for status in LoanStatus} | DECISION_STATUSES
+
+
+def validate_decision(item, allowed_statuses=None) -> Decision:
+    """Build a Decision from a parsed JSON object, raising ValueError if it is not a valid decision."""
+    if not isinstance(item, dict):
+        raise ValueError(f"expected an object, got {type(item).__name__}")
+
+    record_id = item.get("application_id") or item.get("loan_id") or item.get("id")
+    if not record_id:
+        raise ValueError("missing application_id")
+
+    status = str(item.get("status", "")).strip().lower()
+    if status not in (allowed_statuses or _allowed_statuses()):
+        raise ValueError(f"unknown status: {item.get('status')!r}")
+    for enum in (ApplicationStatus, LoanStatus):
+        if status in enum._value2member_map_:
+            status = enum(status)
+            break
+
+    amount = item.get("approved_amount")
+    if amount is not None:
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid approved_amount: {amount!r}")
+        if amount < 0:
+            raise ValueError(f"negative approved_amount: {amount}")
+
+    return Decision(
+        application_id=str(record_id),
+        status=status,
+        reason=str(item.get("reason") or ""),
+        approved_amount=amount,
+        loan_id=item.get("loan_id")
+    )
+
+
+class DecisionStreamParser:
+    """Feed text chunks in; get Decision / DecisionError items out as each object completes."""
+
+    def __init__(self, allowed_statuses=None):
+        self.allowed_statuses = allowed_statuses
+        self.index = 0
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str):
+        results = []
+        for char in text:
+            if self._depth:
+                self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._depth:
+                self._in_string = True
+            elif char == "{":
+                if not self._depth:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    results.append(self._emit("".join(self._buffer)))
+        return results
+
+    def close(self):
+        """Report an unterminated trailing object, if any."""
+        if not self._depth:
+            return []
+        fragment = "".join(self._buffer)
+        self._depth, self._buffer, self._in_string, self._escaped = 0, [], False, False
+        error = DecisionError(self.index, fragment, "unterminated object")
+        self.index += 1
+        return [error]
+
+    def _emit(self, fragment: str):
+        index = self.index
+        self.index += 1
+        try:
+            return validate_decision(json.loads(fragment), self.allowed_statuses)
+        except ValueError as e:
+            return DecisionError(index, fragment, str(e))
+
+
+def iter_decisions(chunks, allowed_statuses=None):
+    """
+    Yield Decision or DecisionError items from an LLM stream (response chunks or strings).
+
+    A plain string or non-streamed response is treated as a single chunk.
+    """
+    if isinstance(chunks, str) or not hasattr(type(chunks), "__iter__"):
+        chunks = [chunks]
+    parser = DecisionStreamParser(allowed_statuses)
+    for chunk in chunks:
+        text = chunk if isinstance(chunk, str) else getattr(chunk, "text", "")
+        if text:
+            yield from parser.feed(text)
+    yield from parser.close()
+
+
+def decision_to_dict(decision: Decision) -> dict:
+    """JSON-ready dict for a Decision (enums as values, unset optional fields dropped)."""
+    data = {
+        "application_id": decision.application_id,
+        "status": getattr(decision.status, "value", decision.status),
+        "reason": decision.reason
+    }
+    if decision.approved_amount is not None:
+        data["approved_amount"] = decision.approved_amount
+    if decision.loan_id is not None:
+        data["loan_id"] = decision.loan_id
+    return data
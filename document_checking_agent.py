@@ -1,13 +1,93 @@
-from crewai import Agent, Task
-from langchain.tools import Tool
-from backend.utils.gemini_client import get_gemini_client
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from crewai import Agent
+from backend.agents.agent_registry import TaskTemplate, agent_tool, get_crew_agent
+from backend.utils.llm_backend import get_llm_client, parse_json_response
+from backend.utils.metrics import instrument_tool
 from backend.data.database import get_collection
 
 
+VERIFICATION_TASK = TaskTemplate(
+    description="""Verify the submitted documents for application ID: {application_id}.
+            Check for:
+            - Identity Proof
+            - Transcripts
+            - Residence Proof
+            - Passport Photo
+            - Income Certificate
+
+            Ensure all are present and valid. Return JSON of status per document and overall status.""",
+    expected_output="A structured JSON verification report with completeness and comments."
+)
+
+REQUIRED_DOCUMENTS = [
+    "identity_proof",
+    "transcripts",
+    "residence_proof",
+    "photo",
+    "income_certificate"
+]
+
+
+def parse_documents(documents):
+    """
+    Submitted document names from a list, dict or comma-separated string.
+
+    A missing field means nothing was submitted (an empty set); None means a value is present
+    but cannot be read.
+    """
+    if documents is None:
+        return set()
+    if isinstance(documents, str):
+        return {doc.strip() for doc in documents.split(",") if doc.strip()}
+    if isinstance(documents, dict):
+        return set(documents)
+    if isinstance(documents, (list, tuple, set)):
+        return {doc if isinstance(doc, str) else getattr(doc, "document_type", str(doc)) for doc in documents}
+    return None
+
+
+def check_documents(application: dict):
+    """
+    Deterministic verification report for one application.
+
+    Returns (report, needs_review): review is needed when a document list is present but cannot
+    be read, or contains entries that are not among the required documents. Applications without
+    a document list are simply incomplete.
+    """
+    submitted = parse_documents(application.get("documents"))
+    document_status = {
+        doc: "valid" if submitted and doc in submitted else "missing"
+        for doc in REQUIRED_DOCUMENTS
+    }
+    missing = [doc for doc, status in document_status.items() if status == "missing"]
+    unrecognized = sorted(submitted - set(REQUIRED_DOCUMENTS)) if submitted else []
+
+    if submitted is None:
+        overall, comments = "flagged", "Submitted documents could not be read."
+    elif unrecognized:
+        overall, comments = "flagged", f"Unrecognized documents: {', '.join(unrecognized)}."
+    elif missing:
+        overall, comments = "incomplete", f"Missing: {', '.join(missing)}."
+    else:
+        overall, comments = "complete", "All required documents submitted."
+
+    report = {
+        "application_id": application.get("id"),
+        "student_name": application.get("student_name"),
+        "documents_status": document_status,
+        "overall_status": overall,
+        "comments": comments
+    }
+    return report, overall == "flagged"
+
+
 class DocumentCheckingAgent:
     def __init__(self):
-        self.gemini = get_gemini_client()
+        self.gemini = get_llm_client()
+        self.max_workers = 4
 
+    @instrument_tool("document_checker")
     def verify_documents(self, application_id: str):
         try:
             collection = get_collection("applications")
@@ -17,17 +97,7 @@ class DocumentCheckingAgent:
 
             application = data["metadatas"][0]
             documents = application.get("documents", {})
-            required_documents = [
-                "identity_proof",
-                "transcripts",
-                "residence_proof",
-                "photo",
-                "income_certificate"
-            ]
-            document_status = {
-                doc: "valid" if doc in documents else "missing"
-                for doc in required_documents
-            }
+            document_status = check_documents(dict(application, id=application_id))[0]["documents_status"]
 
             response = self.gemini.generate_content(
                 f"""You are verifying documents for student {application['student_name']}:
@@ -48,14 +118,92 @@ class DocumentCheckingAgent:
                   "overall_status": "complete/incomplete/flagged",
                   "comments": "..."
                 }}
-                """
+                """,
+                expect_json=True
             )
 
             return response.text
         except Exception as e:
             return f"Error during document verification: {e}"
 
+    def verify_documents_batch(self, application_ids):
+        """
+        Verify many applications, yielding one report dict per application as it is ready.
+
+        All applications are fetched in one get(); complete and incomplete ones are decided
+        locally and yielded first, and only flagged ones go to the LLM (at most max_workers at
+        a time). Reports for unknown ids have overall_status "not_found".
+        """
+        application_ids = list(dict.fromkeys(application_ids))
+        try:
+            data = get_collection("applications").get(ids=application_ids)
+        except Exception as e:
+            print(f"Error fetching applications for document verification: {e}")
+            for application_id in application_ids:
+                yield {"application_id": application_id, "overall_status": "error", "comments": str(e)}
+            return
+
+        found = {}
+        for record_id, meta in zip(data["ids"], data["metadatas"]):
+            found[record_id] = dict(meta, id=record_id)
+
+        for application_id in application_ids:
+            if application_id not in found:
+                yield {"application_id": application_id, "overall_status": "not_found",
+                       "comments": "Application not found."}
+        yield from self.verify_records([found[i] for i in application_ids if i in found])
+
+    def verify_records(self, applications):
+        """Verify already-fetched application metadatas (with "id"), yielding reports as they are ready."""
+        flagged = []
+        for application in applications:
+            report, needs_review = check_documents(application)
+            if needs_review:
+                flagged.append((application, report))
+            else:
+                yield report
+
+        if not flagged:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(flagged))) as pool:
+            futures = [pool.submit(self._review_flagged, application, report) for application, report in flagged]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _review_flagged(self, application, report):
+        """Ask the LLM to review a flagged application; keep the deterministic report if it fails."""
+        try:
+            response = self.gemini.generate_content(
+                f"""You are verifying documents for student {application.get('student_name')}:
+                {application.get('documents')}
+
+                Required:
+                - Identity Proof
+                - Transcripts
+                - Residence Proof
+                - Photo
+                - Income Certificate
+
+                An automatic check flagged this application: {report['comments']}
+                Decide whether the submitted documents satisfy the requirements.
+
+                Return:
+                {json.dumps(dict(report, overall_status="complete/incomplete/flagged", comments="..."))}
+                """,
+                expect_json=True
+            )
+            reviewed = parse_json_response(response.text)
+            if isinstance(reviewed, dict) and reviewed.get("overall_status") in ("complete", "incomplete", "flagged"):
+                return dict(report, overall_status=reviewed["overall_status"],
+                            comments=reviewed.get("comments", report["comments"]), reviewed_by="llm")
+        except Exception as e:
+            print(f"Error reviewing documents for {report['application_id']}: {e}")
+        return report
+
     def get_agent(self):
+        return get_crew_agent("document_checker", self._build_agent)
+
+    def _build_agent(self):
         return Agent(
             role="Document Checking Agent",
             goal="Ensure all required admission documents are present and valid.",
@@ -64,8 +212,9 @@ class DocumentCheckingAgent:
             verbose=True,
             allow_delegation=False,
             tools=[
-                Tool.from_function(
-                    func=self.verify_documents,
+                agent_tool(
+                    "document_checker",
+                    self.verify_documents,
                     name="VerifyDocuments",
                     description="Checks if the submitted application documents are valid and complete."
                 )
@@ -73,16 +222,4 @@ class DocumentCheckingAgent:
         )
 
     def create_verification_task(self, application_id: str):
-        return Task(
-            description=f"""Verify the submitted documents for application ID: {application_id}.
-            Check for:
-            - Identity Proof
-            - Transcripts
-            - Residence Proof
-            - Passport Photo
-            - Income Certificate
-
-            Ensure all are present and valid. Return JSON of status per document and overall status.""",
-            expected_output="A structured JSON verification report with completeness and comments.",
-            agent=self.get_agent()
-        )
+        return VERIFICATION_TASK.bind(self.get_agent(), application_id=application_id)
@@ -0,0 +1,138 @@
+# intent_router.py (local intent routing for chatbot dispatch)
+#
+# Fast path: one compiled regex with a named group per intent.
+# Fallback: cosine similarity of a hashed bag-of-words vector against precomputed intent centroids.
+# Neither path calls the LLM, and recent routings are memoized.
+
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+GENERAL = "general"
+
+# Ordered by priority: when several intents match, the earlier one wins
+INTENT_KEYWORDS = {
+    "loan": ["loan", "loans", "finance", "financial aid", "fee", "fees", "scholarship", "tuition", "emi"],
+    "status": ["status", "stage", "progress", "where is my application", "update on my application"],
+    "overview": ["application", "applications", "overview", "report", "summary", "statistics"],
+    "bottleneck": ["bottleneck", "bottlenecks", "problem", "problems", "delay", "delayed", "stuck"],
+    "message": ["message", "communicate", "talk", "contact", "email me"],
+}
+
+# Example phrasings used to build the fallback centroids
+INTENT_EXAMPLES = {
+    "loan": [
+        "how much money can i borrow for my studies",
+        "can the university help me pay for college",
+        "i cannot afford the admission costs",
+        "is there any financial support for poor students",
+        "when do i need to pay",
+    ],
+    "status": [
+        "has my form been checked yet",
+        "what happens next with my admission",
+        "am i selected",
+        "did you review my documents",
+        "how far along is my admission",
+    ],
+    "overview": [
+        "how many students applied this year",
+        "give me numbers for all candidates",
+        "show the admission dashboard",
+        "how many people were shortlisted",
+    ],
+    "bottleneck": [
+        "why is everything taking so long",
+        "what is slowing down admissions",
+        "nothing has moved for weeks",
+        "which step is holding things up",
+    ],
+    "message": [
+        "can someone get back to me",
+        "i want to speak with a counsellor",
+        "please send me a note about my admission",
+        "who can i reach out to",
+    ],
+}
+
+# Function words carry no intent but dominate short prompts, so they are left out of the features
+STOP_WORDS = frozenset(
+    "a about all am an and any are be been can did do for get give has how i in is it me my of on or our "
+    "please show so that the there this to up we were what when which who why will with you your".split()
+)
+
+VECTOR_DIM = 1024
+# Each centroid averages ~10 phrasings, so even a seed example only scores ~0.23 against its own intent
+SIMILARITY_THRESHOLD = 0.2
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _compile_matcher():
+    alternatives = []
+    for intent, keywords in INTENT_KEYWORDS.items():
+        words = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+        alternatives.append(f"(?P<{intent}>\\b(?:{words})\\b)")
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+_MATCHER = _compile_matcher()
+_PRIORITY = {intent: rank for rank, intent in enumerate(INTENT_KEYWORDS)}
+
+
+def _features(text: str):
+    words = [word[:-1] if len(word) > 3 and word.endswith("s") else word for word in _WORD.findall(text.lower())]
+    words = [word for word in words if word not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def vectorize(text: str) -> np.ndarray:
+    """Hashed bag of words and bigrams, L2-normalized (crc32 keeps buckets stable across processes)."""
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for feature in _features(text):
+        vector[zlib.crc32(feature.encode("utf-8")) % VECTOR_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _build_centroids():
+    intents = list(INTENT_EXAMPLES)
+    centroids = []
+    for intent in intents:
+        # Keywords are folded into the centroid so the fallback also covers near-miss wording
+        examples = INTENT_EXAMPLES[intent] + INTENT_KEYWORDS.get(intent, [])
+        centroid = np.mean([vectorize(example) for example in examples], axis=0)
+        centroids.append(centroid / np.linalg.norm(centroid))
+    return intents, np.vstack(centroids)
+
+
+_CENTROID_INTENTS, _CENTROIDS = _build_centroids()
+
+
+def match_keywords(prompt: str):
+    """Fast path: the highest-priority intent whose keyword appears in the prompt, or None."""
+    matched = {match.lastgroup for match in _MATCHER.finditer(prompt)}
+    if not matched:
+        return None
+    return min(matched, key=_PRIORITY.__getitem__)
+
+
+def classify(prompt: str):
+    """Fallback: (intent, similarity) of the nearest centroid, GENERAL below the threshold."""
+    scores = _CENTROIDS @ vectorize(prompt)
+    best = int(np.argmax(scores))
+    if scores[best] < SIMILARITY_THRESHOLD:
+        return GENERAL, float(scores[best])
+    return _CENTROID_INTENTS[best], float(scores[best])
+
+
+@lru_cache(maxsize=2048)
+def _route(normalized: str) -> str:
+    return match_keywords(normalized) or classify(normalized)[0]
+
+
+def route_intent(prompt: str) -> str:
+    """Route a chat prompt to one of INTENT_KEYWORDS' intents or GENERAL, without any API call."""
+    return _route(" ".join(prompt.lower().split()))
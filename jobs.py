@@ -0,0 +1,299 @@
+# jobs.py (SQLite-backed background job queue for long-running agent runs)
+#
+# Submitting a job only inserts a row and returns its id; a pool of worker threads claims
+# pending jobs and runs the agent method. The queue may be shared by several processes: each
+# claimed job records its owner and a heartbeat, and only jobs whose lease has expired (their
+# owner died) are put back to pending. An identical job (same kind and params) that is still
+# pending is returned instead of queueing a duplicate.
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from backend.utils.metrics import is_error_result
+
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "./jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# How often idle workers look for jobs submitted by other processes (seconds)
+POLL_INTERVAL = 1.0
+
+# Running jobs refresh their heartbeat this often; a job whose heartbeat is older than
+# LEASE_SECONDS is considered orphaned and is requeued (seconds)
+HEARTBEAT_INTERVAL = 10.0
+LEASE_SECONDS = 60.0
+
+# Job kind -> (agent name, method) in backend.utils.services
+JOB_KINDS = {
+    "screening": ("admission_officer", "screen_applications"),
+    "shortlisting": ("shortlisting_agent", "shortlist_applications"),
+    "application_shortlisting": ("shortlisting_agent", "shortlist_application"),
+    "loan_processing": ("loan_agent", "process_loan_requests"),
+    "document_verification": ("document_checker", "verify_documents"),
+    "communication": ("student_counsellor", "communicate_with_student"),
+    "bulk_communication": ("student_counsellor", "communicate_bulk"),
+}
+
+PENDING, RUNNING, SUCCEEDED, FAILED = "pending", "running", "succeeded", "failed"
+
+# Singleton to maintain a single queue per process
+_job_queue = None
+_queue_lock = threading.Lock()
+
+# Job id of the job running on the current worker thread (for report_progress)
+_current = threading.local()
+
+
+def dedup_key(kind: str, params: dict) -> str:
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _run_job(kind: str, params: dict):
+    from backend.utils.services import call_agent
+    agent_name, method = JOB_KINDS[kind]
+    return call_agent(agent_name, method, **params)
+
+
+class JobQueue:
+    """Persistent job table plus the worker threads that drain it."""
+
+    def __init__(self, path: str = JOBS_DB_PATH, workers: int = JOB_WORKERS, runner=_run_job):
+        self.workers = workers
+        self.runner = runner
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._stopping = False
+        self._threads = []
+        self._active = set()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                dedup_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT,
+                heartbeat_at REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        # At most one pending job per dedup key, enforced by SQLite
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_pending_dedup ON jobs(dedup_key) WHERE status = 'pending'"
+        )
+        self._conn.commit()
+
+    def recover(self):
+        """Requeue running jobs whose owner stopped heartbeating. Returns how many were requeued."""
+        requeued = 0
+        with self._lock:
+            orphaned = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (RUNNING, time.time() - LEASE_SECONDS)
+            ).fetchall()
+            for row in orphaned:
+                try:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, heartbeat_at = NULL WHERE id = ?",
+                        (PENDING, row["id"])
+                    )
+                    requeued += 1
+                except sqlite3.IntegrityError:
+                    # An identical job is already pending; let that one do the work
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (FAILED, "Owner stopped; superseded by an identical pending job.", time.time(), row["id"])
+                    )
+            self._conn.commit()
+            if requeued:
+                self._wake.notify_all()
+        return requeued
+
+    def submit(self, kind: str, params: dict = None) -> dict:
+        """
+        Queue a job (or return the identical pending one).
+
+        A running job is never returned: it may already have read its input, so records added
+        since then would be missed.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        params = params or {}
+        key = dedup_key(kind, params)
+        with self._lock:
+            try:
+                job_id = str(uuid.uuid4())
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, params, dedup_key, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(params, sort_keys=True, default=str), key, PENDING, time.time())
+                )
+                self._conn.commit()
+                self._wake.notify()
+            except sqlite3.IntegrityError:
+                job_id = self._conn.execute(
+                    "SELECT id FROM jobs WHERE dedup_key = ? AND status = ?", (key, PENDING)
+                ).fetchone()["id"]
+            return self.get(job_id)
+
+    def get(self, job_id: str):
+        """Job record as a dict, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        if job["result"] is not None:
+            try:
+                job["result"] = json.loads(job["result"])
+            except ValueError:
+                pass  # plain-text agent result
+        del job["dedup_key"], job["heartbeat_at"]
+        return job
+
+    def set_progress(self, job_id: str, progress: dict):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+            self._conn.commit()
+
+    def _claim(self):
+        # Caller holds self._lock
+        row = self._conn.execute(
+            "SELECT id, kind, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (PENDING,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        cursor = self._conn.execute(
+            """UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, owner = ?, heartbeat_at = ?
+               WHERE id = ? AND status = ?""",
+            (RUNNING, now, self.owner, now, row["id"], PENDING)
+        )
+        self._conn.commit()
+        if not cursor.rowcount:
+            return None
+        self._active.add(row["id"])
+        return row
+
+    def _finish(self, job_id: str, status: str, result=None, error=None):
+        # A job whose lease expired may have been reclaimed by another worker; leave it to that one
+        with self._lock:
+            self._active.discard(job_id)
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?
+                   WHERE id = ? AND status = ? AND owner = ?""",
+                (status, result, error, time.time(), job_id, RUNNING, self.owner)
+            )
+            self._conn.commit()
+        if not cursor.rowcount:
+            print(f"Job {job_id} was reclaimed by another worker; its result from {self.owner} was discarded.")
+
+    def _heartbeat(self):
+        """Keep the leases of this queue's running jobs fresh and reclaim orphaned jobs."""
+        while True:
+            with self._lock:
+                if self._stopping and not self._active:
+                    return
+                if self._active:
+                    self._conn.execute(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = ? "
+                        f"AND id IN ({','.join('?' * len(self._active))})",
+                        (time.time(), self.owner, RUNNING, *self._active)
+                    )
+                    self._conn.commit()
+                if not self._stopping:
+                    self.recover()
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                job = None
+                while not self._stopping:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self._wake.wait(POLL_INTERVAL)
+                if job is None:
+                    return
+
+            _current.job_id = job["id"]
+            try:
+                result = self.runner(job["kind"], json.loads(job["params"]))
+                if not isinstance(result, str):
+                    result = json.dumps(result, default=str)
+                if is_error_result(result):
+                    # Agent tools report failures as strings rather than raising
+                    self._finish(job["id"], FAILED, error=result)
+                else:
+                    self._finish(job["id"], SUCCEEDED, result=result)
+            except Exception as e:
+                print(f"Error running job {job['id']} ({job['kind']}): {e}")
+                self._finish(job["id"], FAILED, error="".join(traceback.format_exception_only(type(e), e)).strip())
+            finally:
+                _current.job_id = None
+
+    def start(self):
+        """Requeue orphaned jobs and start the worker and heartbeat threads."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            self.recover()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming new jobs. Running jobs finish in the background (or are requeued once their lease expires)."""
+        with self._lock:
+            self._stopping = True
+            self._wake.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue (workers are started by start())."""
+    global _job_queue
+
+    if _job_queue is None:
+        with _queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+
+    return _job_queue
+
+
+def stop_job_queue():
+    """Stop the workers if the queue was started in this process."""
+    if _job_queue is not None:
+        _job_queue.stop()
+
+
+def report_progress(**progress):
+    """Record progress for the job running on this thread; a no-op outside job workers."""
+    job_id = getattr(_current, "job_id", None)
+    if job_id and _job_queue is not None:
+        _job_queue.set_progress(job_id, progress)
@@ -0,0 +1,224 @@
+# llm_cache.py (two-tier LLM response cache: in-memory LRU in front of SQLite)
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "./llm_cache.sqlite3")
+
+# Call options that do not change the response text and are left out of the cache key
+_UNKEYED_OPTIONS = ("stream",)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so prompts differing only in indentation share a cache entry."""
+    return re.sub(r"\s+", " ", str(prompt)).strip()
+
+
+def cache_key(model: str, prompt: str, options: dict = None) -> str:
+    """Cache key: model plus a hash of the normalized prompt and any generation options."""
+    payload = normalize_prompt(prompt)
+    options = {name: value for name, value in (options or {}).items() if name not in _UNKEYED_OPTIONS}
+    if options:
+        payload += "\x00" + json.dumps(options, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+def cacheable(text: str, expect_json: bool) -> bool:
+    """Whether a response may be stored: never empty, and parseable when the caller expects JSON."""
+    if not text:
+        return False
+    if not expect_json:
+        return True
+    from backend.utils.llm_backend import parse_json_response
+    return parse_json_response(text) is not None
+
+
+class CachedResponse:
+    """Response object served from the cache (exposes .text like the Gemini response)."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class CachedLLMClient:
+    """Wraps an LLM client's generate_content with an LRU + SQLite response cache."""
+
+    def __init__(self, client, path: str = LLM_CACHE_PATH, ttl: float = 86400.0,
+                 max_memory_entries: int = 1024, max_disk_entries: int = 100000, model: str = None):
+        self.client = client
+        self.model = model or getattr(client, "model_name", None) or type(client).__name__
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        self._conn.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, client, model: str = None):
+        """Build a cache configured through LLM_CACHE_* environment variables."""
+        return cls(
+            client,
+            model=model,
+            path=os.environ.get("LLM_CACHE_PATH", LLM_CACHE_PATH),
+            ttl=float(os.environ.get("LLM_CACHE_TTL", "86400")),
+            max_memory_entries=int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "1024")),
+            max_disk_entries=int(os.environ.get("LLM_CACHE_DISK_ENTRIES", "100000")),
+        )
+
+    def __getattr__(self, name):
+        # Anything not cached (e.g. stats() on the local backend) goes to the wrapped client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _lookup(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return text
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            text, created_at = row
+            if created_at + self.ttl <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, text, created_at + self.ttl)
+            self.disk_hits += 1
+            return text
+
+    def _remember(self, key: str, text: str, expires_at: float):
+        # Caller holds self._lock
+        self._memory[key] = (text, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, key: str, text: str, elapsed: float, expect_json: bool = False):
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += elapsed
+            if not cacheable(text, expect_json):
+                # Unreadable answers are retried on the next call instead of being replayed
+                return
+            self._remember(key, text, now + self.ttl)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, self.model, text, now, now)
+            )
+            # Size-based eviction: drop least recently used rows beyond the disk limit
+            self._conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_disk_entries,)
+            )
+            self._conn.commit()
+
+    def generate_content(self, prompt, expect_json: bool = False, **kwargs):
+        """
+        Serve identical prompts from the cache (a hit streams as one chunk); otherwise call the wrapped client.
+
+        With expect_json, responses that parse_json_response cannot read are not stored.
+        """
+        key = cache_key(self.model, prompt, kwargs)
+        text = self._lookup(key)
+        if kwargs.get("stream"):
+            if text is not None:
+                return iter([CachedResponse(text)])
+            return self._stream_and_store(key, prompt, expect_json, **kwargs)
+        if text is not None:
+            return CachedResponse(text)
+
+        start = time.perf_counter()
+        response = self.client.generate_content(prompt, **kwargs)
+        self._store(key, response.text, time.perf_counter() - start, expect_json)
+        return response
+
+    def _stream_and_store(self, key: str, prompt, expect_json: bool, **kwargs):
+        """Pass streamed chunks through, caching the full text once the stream completes."""
+        start = time.perf_counter()
+        parts = []
+        for chunk in self.client.generate_content(prompt, **kwargs):
+            parts.append(getattr(chunk, "text", "") or "")
+            yield chunk
+        self._store(key, "".join(parts), time.perf_counter() - start, expect_json)
+
+    async def generate_content_async(self, prompt, expect_json: bool = False, **kwargs):
+        """Async variant of generate_content (used by AsyncLLMClient)."""
+        native = getattr(self.client, "generate_content_async", None)
+        if native is None:
+            return await asyncio.to_thread(self.generate_content, prompt, expect_json, **kwargs)
+        if kwargs.get("stream"):
+            return await native(prompt, **kwargs)
+
+        key = cache_key(self.model, prompt, kwargs)
+        text = self._lookup(key)
+        if text is not None:
+            return CachedResponse(text)
+
+        start = time.perf_counter()
+        response = await native(prompt, **kwargs)
+        self._store(key, response.text, time.perf_counter() - start, expect_json)
+        return response
+
+    def cache_stats(self):
+        """Hit/miss counters and an estimate of API time saved by hits."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            avg_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "model": self.model,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / (hits + self.misses) if hits + self.misses else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "estimated_seconds_saved": hits * avg_miss,
+            }
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
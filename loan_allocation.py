@@ -0,0 +1,261 @@
+# loan_allocation.py (deterministic budget-constrained loan allocation)
+#
+# Every requested loan gets a need score from the applicant's income category, marks and the
+# requested amount relative to tuition. Loans are funded greedily in score order until the
+# remaining budget runs out; the loan at the boundary may be partially funded, and if that
+# partial award would be too small the leftover is offered to lower-ranked requests instead.
+#
+# Allocations are serialized across threads and processes by a write transaction on a small
+# SQLite lock database, held from reading the budget until the decisions are written.
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from backend.data.admission_status import record_transitions
+from backend.data.database import get_collection, get_db_client
+from backend.data.watermark import change_stamp
+
+AVERAGE_TUITION = 150000.0
+
+# Largest single award, as a multiple of average tuition
+MAX_AWARD_TUITION_MULTIPLE = 1.0
+
+# Partial awards smaller than this fraction of the request are rejected instead
+MIN_PARTIAL_FRACTION = 0.25
+
+# Financial need by income category (case-insensitive); unknown categories use "default"
+INCOME_NEED = {
+    "sc/st": 1.0,
+    "ews": 0.9,
+    "obc": 0.7,
+    "general": 0.4,
+    "default": 0.5,
+}
+
+# Weights of the need score components
+NEED_WEIGHTS = {"income": 0.5, "merit": 0.3, "justification": 0.2}
+
+BUDGET_LOCK_PATH = os.environ.get("BUDGET_LOCK_PATH", "./budget_lock.sqlite3")
+
+# Seconds to wait for another allocator (in any process) to finish
+BUDGET_LOCK_TIMEOUT = 60.0
+
+_budget_lock = threading.Lock()
+
+
+class BudgetConflictError(RuntimeError):
+    """Raised when another allocator holds the loan budget for longer than BUDGET_LOCK_TIMEOUT."""
+
+
+def need_scores(income_categories, marks, amounts, tuition: float = AVERAGE_TUITION, weights=None):
+    """Vectorized need score in [0, 1] for each request."""
+    weights = weights or NEED_WEIGHTS
+    categories = np.char.lower(np.asarray(income_categories, dtype=str))
+    income = np.full(len(categories), INCOME_NEED["default"])
+    for category, need in INCOME_NEED.items():
+        income[categories == category] = need
+
+    merit = np.clip(np.nan_to_num(np.asarray(marks, dtype=float), nan=0.0) / 100.0, 0.0, 1.0)
+    ratio = np.asarray(amounts, dtype=float) / tuition
+    # Requests up to tuition are fully justified; larger ones are discounted proportionally
+    justification = np.where(ratio <= 1.0, 1.0, 1.0 / np.maximum(ratio, 1e-9))
+
+    return weights["income"] * income + weights["merit"] * merit + weights["justification"] * justification
+
+
+def allocate(amounts, scores, budget: float, max_award: float = AVERAGE_TUITION * MAX_AWARD_TUITION_MULTIPLE,
+             min_partial_fraction: float = MIN_PARTIAL_FRACTION):
+    """
+    Return the approved amount per request (0 = rejected) without exceeding budget.
+
+    Requests are funded in descending score order (ties keep input order); each award is capped
+    at max_award and the first one that does not fit entirely gets what is left of the budget.
+    If that partial award is below min_partial_fraction of the request it is dropped and the
+    leftover goes to the next lower-ranked requests, so smaller requests that fit are funded.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    capped = np.minimum(np.maximum(amounts, 0.0), max_award)
+    order = np.argsort(-np.asarray(scores, dtype=float), kind="stable")
+
+    # One pass in score order carrying the remaining budget forward
+    granted = np.zeros(len(order))
+    left = float(budget)
+    for rank, wanted in enumerate(capped[order].tolist()):
+        if left <= 0:
+            break
+        if wanted <= left:
+            granted[rank] = wanted
+            left -= wanted
+        # Partial awards below min_partial_fraction are skipped in favour of smaller lower-ranked requests
+        elif wanted * min_partial_fraction <= left:
+            granted[rank] = left
+            break
+
+    approved = np.zeros_like(amounts)
+    approved[order] = granted
+    return approved
+
+
+def _batch_size():
+    client = get_db_client()
+    return client.get_max_batch_size() if hasattr(client, "get_max_batch_size") else 5000
+
+
+def _applicant_profiles(student_ids):
+    """Income category and average marks per student, fetched in batched $in queries."""
+    profiles = {}
+    unique_ids = list(dict.fromkeys(student_ids))
+    batch_size = _batch_size()
+    collection = get_collection("applications")
+    for start in range(0, len(unique_ids), batch_size):
+        batch = unique_ids[start:start + batch_size]
+        for meta in collection.get(where={"student_id": {"$in": batch}}, include=["metadatas"])["metadatas"]:
+            try:
+                marks = (float(meta.get("marks_10")) + float(meta.get("marks_12"))) / 2
+            except (TypeError, ValueError):
+                marks = np.nan
+            profiles[meta.get("student_id")] = (str(meta.get("income_category") or ""), marks)
+    return profiles
+
+
+def plan_allocation(loan_requests, budget: float, tuition: float = AVERAGE_TUITION):
+    """Compute decisions for loan request metadatas against a budget. Returns (decisions, total_approved)."""
+    if not loan_requests:
+        return [], 0.0
+
+    profiles = _applicant_profiles([loan.get("student_id") for loan in loan_requests])
+    categories, marks = zip(*(profiles.get(loan.get("student_id"), ("", np.nan)) for loan in loan_requests))
+    amounts = np.array([float(loan.get("amount_requested") or 0.0) for loan in loan_requests])
+
+    scores = need_scores(categories, marks, amounts, tuition)
+    approved = allocate(amounts, scores, budget, max_award=tuition * MAX_AWARD_TUITION_MULTIPLE)
+
+    decisions = []
+    for loan, amount, score, granted in zip(loan_requests, amounts, scores, approved):
+        if granted <= 0:
+            reason = "Budget exhausted by higher-need requests." if amount > 0 else "No amount requested."
+        elif granted < amount:
+            reason = f"Partially funded ({granted:,.0f} of {amount:,.0f}) within the remaining budget."
+        else:
+            reason = "Fully funded based on need score."
+        decisions.append({
+            "loan_id": loan.get("id"),
+            "student_id": loan.get("student_id"),
+            "status": "approved" if granted > 0 else "rejected",
+            "approved_amount": round(float(granted), 2),
+            "need_score": round(float(score), 4),
+            "reason": reason
+        })
+    return decisions, float(approved.sum())
+
+
+@contextmanager
+def _serialized_budget():
+    """Hold the process lock and an exclusive SQLite write transaction shared by all processes."""
+    with _budget_lock:
+        conn = sqlite3.connect(BUDGET_LOCK_PATH, timeout=BUDGET_LOCK_TIMEOUT, isolation_level=None)
+        try:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                raise BudgetConflictError(f"Loan budget is held by another allocator: {e}") from e
+            try:
+                yield
+            finally:
+                conn.execute("ROLLBACK")
+        finally:
+            conn.close()
+
+
+def _read_budget():
+    data = get_collection("university_budget").get(where={"type": "loan"})
+    if not data["metadatas"]:
+        return None, None
+    return data["ids"][0], data["metadatas"][0]
+
+
+def _update_budget(budget_id, budget, remaining: float):
+    updated = dict(budget, remaining_budget=remaining, version=int(budget.get("version", 0)) + 1,
+                   updated_on=datetime.now().isoformat())
+    get_collection("university_budget").update(ids=[budget_id], metadatas=[updated])
+
+
+def _still_requested(loan_requests):
+    """Current metadatas of the given loans that are still awaiting a decision."""
+    ids = list(dict.fromkeys(loan.get("id") for loan in loan_requests if loan.get("id")))
+    collection = get_collection("loan_requests")
+    batch_size = _batch_size()
+    current = []
+    for start in range(0, len(ids), batch_size):
+        data = collection.get(ids=ids[start:start + batch_size], where={"status": "requested"},
+                              include=["metadatas"])
+        current.extend(dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"]))
+    return current
+
+
+def _write_loans(loan_requests, decisions, written):
+    """Persist decisions in batches, appending each decision to written once its batch is stored."""
+    now = datetime.now().isoformat()
+    stamp = change_stamp()
+    by_id = {loan.get("id"): loan for loan in loan_requests}
+    collection = get_collection("loan_requests")
+    batch_size = _batch_size()
+    for start in range(0, len(decisions), batch_size):
+        batch = decisions[start:start + batch_size]
+        metadatas = []
+        for decision in batch:
+            metadata = dict(by_id[decision["loan_id"]])
+            metadata.update(stamp)
+            metadata.update({
+                "status": decision["status"],
+                "approved_amount": decision["approved_amount"],
+                "evaluation_notes": decision["reason"],
+                "evaluated_by": "loan_agent",
+                "decision_date": now
+            })
+            metadatas.append(metadata)
+        collection.update(ids=[meta["id"] for meta in metadatas], metadatas=metadatas)
+        written.extend(batch)
+        record_transitions("loan_requests", [
+            (by_id[decision["loan_id"]].get("status"), decision["status"]) for decision in batch
+        ])
+
+
+def run_allocation(loan_requests, tuition: float = AVERAGE_TUITION):
+    """
+    Allocate the loan budget across loan_requests and persist the result.
+
+    The budget is read, planned against and spent while holding _serialized_budget(), so
+    allocators in any process run one at a time. Only loans that are still "requested" at that
+    point are allocated; loans decided by an earlier run are left alone. The budget is charged
+    before the decisions are written, and if writing fails part-way only the amount of the
+    unwritten approvals is refunded. Returns (decisions, remaining_budget).
+    """
+    with _serialized_budget():
+        budget_id, budget = _read_budget()
+        if budget is None:
+            raise LookupError("Loan budget information is missing.")
+        remaining = float(budget.get("remaining_budget", 0))
+
+        loan_requests = _still_requested(loan_requests)
+        if not loan_requests:
+            return [], remaining
+
+        decisions, total = plan_allocation(loan_requests, remaining, tuition)
+        _update_budget(budget_id, budget, remaining - total)
+
+        written = []
+        try:
+            _write_loans(loan_requests, decisions, written)
+        except Exception:
+            # Refund only the approvals that were not recorded, relative to the current budget
+            refund = sum(decision["approved_amount"] for decision in decisions[len(written):])
+            budget_id, current = _read_budget()
+            _update_budget(budget_id, current, float(current.get("remaining_budget", 0)) + refund)
+            raise
+        return decisions, remaining - total
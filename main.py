@@ -1,18 +1,20 @@
 # main.py
 
+import asyncio
+import json
 import os
-from fastapi import FastAPI, Request
+import shutil
+import tempfile
+import time
+from fastapi import FastAPI, File, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
-# Updated import for ChromaDB-based initialization
-from backend.data.database import initialize_collections
-
-# Agents using ChromaDB-based logic
-from backend.agents.admisson_officer_agent import AdmissionOfficerAgent
-from backend.agents.document_checking_agent import DocumentCheckingAgent
-from backend.agents.shortlisting_agent import ShortlistingAgent
-from backend.agents.student_counsellor import StudentCounsellorAgent
-from backend.agents.studen_loan_agent import StudentLoanAgent
+# Agents, ChromaDB and the LLM client are initialized lazily (see backend.utils.services),
+# so importing this module stays cheap for every uvicorn worker
+from backend.utils import metrics
+from backend.utils.async_exec import get_executor, run_agent, run_bulk, run_db, shutdown_executors
+from backend.utils.services import call_agent, get_agent, readiness, warm_up
 
 # Initialize FastAPI app
 app = FastAPI(title="University Admission System API")
@@ -26,61 +28,215 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize ChromaDB collections
-initialize_collections()
-
-# Initialize Agents
-admission_officer = AdmissionOfficerAgent()
-document_checker = DocumentCheckingAgent()
-shortlisting_agent = ShortlistingAgent()
-student_counsellor = StudentCounsellorAgent()
-loan_agent = StudentLoanAgent()
+# Per-route latency (labelled by route template, not raw path) and an optional tracing span
+@app.middleware("http")
+async def record_route_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        with metrics.span(f"{request.method} {request.url.path}"):
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
+# Warm agents and clients in the background; /ready reports when that has finished
+@app.on_event("startup")
+async def startup():
+    if os.environ.get("WARM_ON_STARTUP", "1") != "0":
+        asyncio.get_running_loop().run_in_executor(get_executor("agent"), warm_up)
+
+# Background job workers; running jobs whose owner process died are requeued
+@app.on_event("startup")
+async def start_job_workers():
+    if os.environ.get("JOB_WORKERS", "2") != "0":
+        from backend.utils.jobs import get_job_queue
+        await run_db(get_job_queue().start)
+
+# Blocking agent calls run on bounded worker pools (see backend.utils.async_exec)
+@app.on_event("shutdown")
+async def shutdown():
+    from backend.utils.jobs import stop_job_queue
+    stop_job_queue()
+    shutdown_executors()
+
+# Readiness probe: 503 until the background warm-up has completed
+@app.get("/ready")
+async def ready():
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
 
 # Root route
 @app.get("/")
 async def root():
     return {"message": "University Admission System is running"}
 
-# Get all applications
+# List applications a page at a time (or the whole collection as NDJSON with stream=true)
 @app.get("/applications")
-async def get_all_applications():
-    return admission_officer.get_all_applications()
+async def get_all_applications(limit: int = 100, cursor: str = None, fields: str = None,
+                               status: str = None, stream: bool = False):
+    from backend.data.pagination import InvalidCursorError, clamp_limit, get_page, ndjson_lines, status_filter
+    if limit < 1:
+        return JSONResponse({"error": "limit must be at least 1."}, status_code=400)
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    where = status_filter(status)
+    if stream:
+        return StreamingResponse(
+            ndjson_lines("applications", page_size=clamp_limit(limit), fields=fields, where=where),
+            media_type="application/x-ndjson"
+        )
+    try:
+        return await run_db(get_page, "applications", limit=limit, cursor=cursor, fields=fields, where=where)
+    except InvalidCursorError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+# Bulk import applicants from an uploaded CSV or JSONL file
+@app.post("/applications/bulk")
+async def bulk_ingest_applications(file: UploadFile = File(...), batch_size: int = 5000, batch_id: str = None):
+    from backend.data.bulk_ingest import checkpoint_path, ingest_file
+    suffix = ".jsonl" if file.filename.lower().endswith((".jsonl", ".ndjson")) else ".csv"
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        await run_bulk(shutil.copyfileobj, file.file, tmp)
+    try:
+        return await run_bulk(
+            ingest_file, tmp.name, batch_size=batch_size, resume=False,
+            source_key=f"upload:{batch_id}" if batch_id else None
+        )
+    finally:
+        for path in (tmp.name, checkpoint_path(tmp.name)):
+            if os.path.exists(path):
+                os.remove(path)
+
+# Verify documents for many applications; one NDJSON report per line, streamed as each finishes
+@app.post("/applications/verify-documents")
+async def verify_documents_batch(request: dict):
+    checker = await run_agent(get_agent, "document_checker")
+    reports = (json.dumps(report) + "\n" for report in checker.verify_documents_batch(request["application_ids"]))
+    return StreamingResponse(reports, media_type="application/x-ndjson")
 
 # Get specific application details
 @app.get("/applications/{application_id}")
 async def get_application(application_id: str):
-    return admission_officer.get_application_details(application_id)
+    return await run_agent(call_agent, "admission_officer", "get_application_details", application_id)
 
 # Verify documents for a specific application
 @app.post("/applications/{application_id}/verify-documents")
 async def verify_documents(application_id: str):
-    return document_checker.verify_documents(application_id)
+    return await run_agent(call_agent, "document_checker", "verify_documents", application_id)
 
-# Shortlist an application based on eligibility
-@app.post("/applications/{application_id}/shortlist")
+# Shortlist one application based on eligibility (queued job)
+@app.post("/applications/{application_id}/shortlist", status_code=202)
 async def shortlist_application(application_id: str):
-    return shortlisting_agent.evaluate_and_shortlist(application_id)
+    return await submit_job({"kind": "application_shortlisting", "params": {"application_id": application_id}})
+
+# Queue a long-running agent run; poll GET /jobs/{job_id} for progress and the result
+@app.post("/jobs", status_code=202)
+async def submit_job(job: dict):
+    from backend.utils.jobs import get_job_queue
+    try:
+        return await run_db(get_job_queue().submit, job["kind"], job.get("params"))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+# Queue screening of all submitted applications
+@app.post("/applications/screen", status_code=202)
+async def screen_applications():
+    return await submit_job({"kind": "screening"})
+
+# Queue allocation of the loan budget across pending loan requests
+@app.post("/loans/process", status_code=202)
+async def process_loans():
+    return await submit_job({"kind": "loan_processing"})
+
+# Status, progress and result of a queued job
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    from backend.utils.jobs import get_job_queue
+    job = await run_db(get_job_queue().get, job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found."}, status_code=404)
+    return job
 
 # Send a message to a student
 @app.post("/students/{student_id}/communicate")
 async def communicate_with_student(student_id: str, message: dict):
-    return student_counsellor.send_message(student_id, message["content"])
+    return await run_agent(call_agent, "student_counsellor", "send_message", student_id, message["content"])
+
+# Notify a cohort about a stage change from per-(stage, language) templates (queued job)
+@app.post("/students/communicate-bulk", status_code=202)
+async def communicate_bulk(request: dict):
+    return await submit_job({"kind": "bulk_communication", "params": {
+        "student_ids": request["student_ids"],
+        "admission_stage": request["admission_stage"],
+        "medium": request.get("medium", "email")
+    }})
 
 # Process loan request from a student
 @app.post("/students/{student_id}/loan-request")
 async def process_loan(student_id: str, loan_data: dict):
-    return loan_agent.process_loan_request(student_id, loan_data)
+    return await run_agent(call_agent, "loan_agent", "process_loan_request", student_id, loan_data)
 
-# Get overall admission dashboard/status
+# Get overall admission dashboard/status (materialized counters, single record read)
 @app.get("/admission/status")
 async def get_admission_dashboard():
-    return admission_officer.get_admission_status()
+    from backend.data.admission_status import get_admission_status
+    return await run_db(get_admission_status)
+
+# Recompute dashboard counters from the source collections and fix drift
+@app.post("/admission/status/reconcile")
+async def reconcile_admission_dashboard():
+    from backend.data.admission_status import reconcile
+    return await run_bulk(reconcile)
+
+# Aggregate reports from the columnar analytics snapshot (rebuilt when older than max_age seconds)
+@app.get("/analytics")
+async def analytics_overview(max_age: float = None):
+    from backend.data.snapshot import SNAPSHOT_MAX_AGE, get_snapshot
+    from backend.utils.analytics import overview
+    snapshot = await run_bulk(get_snapshot, SNAPSHOT_MAX_AGE if max_age is None else max_age)
+    return overview(snapshot)
+
+# Rebuild the analytics snapshot now
+@app.post("/analytics/refresh")
+async def refresh_analytics():
+    from backend.data.snapshot import refresh_snapshot
+    snapshot = await run_bulk(refresh_snapshot)
+    return snapshot.manifest
 
 # Chat endpoint for chatbot interaction
 @app.post("/chat")
 async def chat_endpoint(message: dict):
     application_id = message.get("application_id")  # Optional context
-    return admission_officer.process_chat_message(message["content"], application_id)
+    if message.get("stream"):
+        from backend.utils.chat_stream import sse_chat_events
+        # Server-sent events from the async LLM stream, consumed on the event loop
+        return StreamingResponse(
+            sse_chat_events(message["content"], application_id), media_type="text/event-stream"
+        )
+    return await run_agent(call_agent, "admission_officer", "process_chat_message", message["content"], application_id)
+
+# Time-to-first-token and response time for streamed chats
+@app.get("/chat/metrics")
+async def chat_metrics():
+    from backend.utils.chat_stream import chat_latency_stats
+    return chat_latency_stats()
+
+# LLM response cache hit/miss counters
+@app.get("/llm/cache-stats")
+async def llm_cache_stats():
+    from backend.utils.llm_backend import get_llm_client
+    client = get_llm_client()
+    if not hasattr(client, "cache_stats"):
+        return {"enabled": False}
+    return {"enabled": True, **client.cache_stats()}
 
 # Run the server
 if __name__ == "__main__":
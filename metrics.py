@@ -0,0 +1,191 @@
+# metrics.py (in-process metrics registry, Prometheus text exposition and optional tracing)
+#
+# Agent tools, LLM calls, ChromaDB operations and API routes record into the module-level
+# REGISTRY; GET /metrics renders it in the Prometheus text format. Tracing spans are emitted
+# through OpenTelemetry when TRACING_ENABLED=1 and the package is installed, otherwise they
+# cost nothing.
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Latency buckets in seconds, from sub-millisecond Chroma reads to multi-minute agent runs
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Agent tools report failures as return strings rather than exceptions
+ERROR_PREFIXES = ("Error", "error", "Shortlisting failed")
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "0") == "1"
+
+
+class Counter:
+    """Monotonic counter with one value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (plus _sum and _count) with one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        rows = []
+        for key, counts, total, count in snapshot:
+            for bound, bucket_count in zip(self.buckets, counts):
+                rows.append((f"{self.name}_bucket", key + (("le", repr(bound)),), bucket_count))
+            rows.append((f"{self.name}_bucket", key + (("le", "+Inf"),), count))
+            rows.append((f"{self.name}_sum", key, total))
+            rows.append((f"{self.name}_count", key, count))
+        return rows
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                pairs = [(label, value_) for label, value_ in zip(metric.labels, key)]
+                pairs += [item for item in key[len(metric.labels):]]
+                label_text = ",".join(f'{label}="{_escape(text)}"' for label, text in pairs)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = Registry()
+
+TOOL_LATENCY = REGISTRY.histogram("agent_tool_duration_seconds", "Agent tool call latency.", ("agent", "tool"))
+TOOL_CALLS = REGISTRY.counter("agent_tool_calls_total", "Agent tool calls by outcome.", ("agent", "tool", "outcome"))
+LLM_LATENCY = REGISTRY.histogram("llm_request_duration_seconds", "LLM call latency.", ("mode",))
+LLM_CALLS = REGISTRY.counter("llm_requests_total", "LLM calls by outcome.", ("mode", "outcome"))
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Estimated prompt/response tokens.", ("direction",))
+LLM_BYTES = REGISTRY.counter("llm_bytes_total", "Prompt/response size in bytes.", ("direction",))
+CHAT_TTFT = REGISTRY.histogram("chat_time_to_first_token_seconds", "Chat stream time to first token.", ("mode",))
+CHAT_DURATION = REGISTRY.histogram("chat_stream_duration_seconds", "Chat stream total response time.", ("mode",))
+CHROMA_LATENCY = REGISTRY.histogram("chroma_operation_duration_seconds", "ChromaDB operation latency.",
+                                    ("collection", "operation"))
+CHROMA_ERRORS = REGISTRY.counter("chroma_operation_errors_total", "Failed ChromaDB operations.",
+                                 ("collection", "operation"))
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "API route latency.", ("method", "route", "status"))
+
+
+_tracer = None
+
+
+def _get_tracer():
+    global _tracer
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            print("TRACING_ENABLED is set but opentelemetry is not installed; spans are disabled.")
+            _tracer = False
+        else:
+            _tracer = trace.get_tracer("admission-system")
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """Tracing span context manager; a no-op unless tracing is enabled and available."""
+    if not TRACING_ENABLED or not _get_tracer():
+        return nullcontext()
+    return _get_tracer().start_as_current_span(name, attributes={k: str(v) for k, v in attributes.items()})
+
+
+def is_error_result(result) -> bool:
+    return isinstance(result, str) and result.startswith(ERROR_PREFIXES)
+
+
+def instrument_tool(agent_name: str):
+    """Decorator for agent tool methods: latency histogram, outcome counter and a tracing span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                with span(f"{agent_name}.{func.__name__}", agent=agent_name):
+                    result = func(*args, **kwargs)
+                outcome = "error" if is_error_result(result) else "ok"
+                return result
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - start, agent=agent_name, tool=func.__name__)
+                TOOL_CALLS.inc(agent=agent_name, tool=func.__name__, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timed_chroma(collection: str, operation: str):
+    start = time.perf_counter()
+    try:
+        with span(f"chroma.{operation}", collection=collection):
+            yield
+    except Exception:
+        CHROMA_ERRORS.inc(collection=collection, operation=operation)
+        raise
+    finally:
+        CHROMA_LATENCY.observe(time.perf_counter() - start, collection=collection, operation=operation)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
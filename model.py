@@ -109,6 +109,16 @@ class Agent:
     assigned_tasks: List[str] = field(default_factory=list)
 
 
+@dataclass
+class Decision:
+    """A single agent decision parsed from LLM output (application or loan)."""
+    application_id: str = ""
+    status: Union[ApplicationStatus, LoanStatus, str] = ""
+    reason: str = ""
+    approved_amount: Optional[float] = None
+    loan_id: Optional[str] = None
+
+
 @dataclass
 class AdmissionProcessStatus:
     """Tracks progress of the admission process for dashboard or bot queries."""
@@ -0,0 +1,127 @@
+# pagination.py (cursor pagination, field projection and page-wise iteration over collections)
+
+import base64
+import json
+
+from backend.data.database import get_collection
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for a different query."""
+
+
+def status_filter(status):
+    """Chroma where clause for one status, a comma-separated string or a list of statuses."""
+    if not status:
+        return None
+    statuses = [s.strip() for s in status.split(",")] if isinstance(status, str) else list(status)
+    statuses = [s for s in statuses if s]
+    if not statuses:
+        return None
+    return {"status": statuses[0]} if len(statuses) == 1 else {"status": {"$in": statuses}}
+
+
+def clamp_limit(limit) -> int:
+    """Page size limited to 1..MAX_PAGE_SIZE."""
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def _fingerprint(where) -> str:
+    return json.dumps(where, sort_keys=True)
+
+
+def encode_cursor(offset: int, where=None) -> str:
+    payload = json.dumps({"offset": offset, "where": _fingerprint(where)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, where=None) -> int:
+    """Offset stored in an opaque cursor; the cursor must belong to the same where filter."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        offset = int(payload["offset"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if payload.get("where") != _fingerprint(where) or offset < 0:
+        raise InvalidCursorError("Cursor does not match this query.")
+    return offset
+
+
+def project(metadata: dict, fields=None) -> dict:
+    """Keep only the requested metadata keys (the record id is always included)."""
+    if not fields:
+        return metadata
+    projected = {"id": metadata.get("id")}
+    projected.update({key: metadata[key] for key in fields if key in metadata})
+    return projected
+
+
+def _read_page(collection, where, offset: int, limit: int):
+    data = collection.get(where=where, limit=limit, offset=offset, include=["metadatas"])
+    return [dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"])]
+
+
+def get_page(collection_name: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, fields=None, where=None):
+    """
+    One page of records: {"items": [...], "next_cursor": str or None}.
+
+    Pages are read with limit/offset in Chroma's storage order; the cursor is opaque to clients.
+    """
+    limit = clamp_limit(limit)
+    offset = decode_cursor(cursor, where) if cursor else 0
+    # Read one extra record to know whether another page exists
+    records = _read_page(get_collection(collection_name), where, offset, limit + 1)
+    next_cursor = encode_cursor(offset + limit, where) if len(records) > limit else None
+    return {
+        "items": [project(record, fields) for record in records[:limit]],
+        "next_cursor": next_cursor
+    }
+
+
+def iter_pages(collection_name: str, page_size: int = DEFAULT_PAGE_SIZE, fields=None, where=None):
+    """Yield lists of records one fixed-size page at a time, so memory stays bounded by page_size."""
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    collection = get_collection(collection_name)
+    offset = 0
+    while True:
+        records = _read_page(collection, where, offset, page_size)
+        if records:
+            yield [project(record, fields) for record in records]
+        if len(records) < page_size:
+            return
+        offset += page_size
+
+
+def iter_pinned_pages(collection_name: str, page_size: int = DEFAULT_PAGE_SIZE, where=None):
+    """
+    Like iter_pages, but the matching ids are listed up front and pages are read by id.
+
+    Use it when records are updated out of the where filter while pages are still being read;
+    offset paging would then skip records. A record that changed in the meantime is returned
+    with its current metadata, so callers should re-check it.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    collection = get_collection(collection_name)
+    ids = collection.get(where=where, include=[])["ids"]
+    for start in range(0, len(ids), page_size):
+        data = collection.get(ids=ids[start:start + page_size], include=["metadatas"])
+        records = [dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"])]
+        if records:
+            yield records
+
+
+def iter_records(collection_name: str, page_size: int = DEFAULT_PAGE_SIZE, fields=None, where=None):
+    """Yield records one by one, reading the collection page by page."""
+    for page in iter_pages(collection_name, page_size, fields, where):
+        yield from page
+
+
+def ndjson_lines(collection_name: str, page_size: int = DEFAULT_PAGE_SIZE, fields=None, where=None):
+    """NDJSON export of a collection, one record per line."""
+    for record in iter_records(collection_name, page_size, fields, where):
+        yield json.dumps(record) + "\n"
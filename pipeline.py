@@ -0,0 +1,293 @@
+# pipeline.py (staged, streaming admission pipeline with bounded queues)
+#
+# Applications flow through screening -> document verification -> shortlisting -> loan
+# allocation -> student notification. Each stage has its own worker threads and takes
+# micro-batches from a bounded input queue, so a slow stage applies backpressure upstream
+# instead of letting work pile up. Only loan allocation waits for the whole shortlisted cohort,
+# because the budget is ranked by need across all of it.
+#
+# Usage:
+#   python -m backend.utils.pipeline --screening-workers 2 --shortlisting-workers 4
+
+import argparse
+import json
+import queue
+import threading
+import time
+
+from backend.data.admission_status import update_statuses
+from backend.data.database import get_collection
+from backend.data.model import ApplicationStatus
+from backend.data.pagination import iter_pinned_pages
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Student ids per $in query when collecting loan requests for allocation
+LOAN_QUERY_BATCH = 1000
+
+
+class StageStats:
+    """Per-stage counters; throughput is items completed per second of stage wall time."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, elapsed: float, failed: bool = False):
+        with self._lock:
+            now = time.perf_counter()
+            self.started_at = self.started_at or now - elapsed
+            self.finished_at = now
+            self.items_in += items_in
+            self.items_out += items_out
+            self.batches += 1
+            self.busy_seconds += elapsed
+            self.errors += int(failed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            wall = (self.finished_at - self.started_at) if self.started_at else 0.0
+            return {
+                "stage": self.name,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "dropped": self.items_in - self.items_out,
+                "batches": self.batches,
+                "errors": self.errors,
+                "busy_s": round(self.busy_seconds, 3),
+                "wall_s": round(wall, 3),
+                "items_per_s": round(self.items_in / wall, 2) if wall else None
+            }
+
+
+class Stage:
+    """
+    A named step: process(batch) returns the items to pass on to the next stage.
+
+    finish(), if given, runs once after the stage's input is exhausted and every batch has been
+    processed; the items it returns are passed on as well.
+    """
+
+    def __init__(self, name: str, process, workers: int = 1, batch_size: int = 1, max_wait: float = 0.05,
+                 finish=None):
+        self.name = name
+        self.process = process
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.finish = finish
+        self.stats = StageStats(name)
+
+
+class Pipeline:
+    """Runs stages concurrently, connected by bounded queues."""
+
+    def __init__(self, stages, queue_size: int = 256):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def _next_batch(self, stage: Stage, inbox: queue.Queue):
+        """Block for one item, then gather up to batch_size within max_wait. None once input is done."""
+        first = inbox.get()
+        if first is _DONE:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + stage.max_wait
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = inbox.get(timeout=remaining) if remaining > 0 else inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                inbox.put(_DONE)  # leave it for this stage's other workers
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self, stage: Stage, inbox: queue.Queue, outbox, on_output):
+        while True:
+            batch = self._next_batch(stage, inbox)
+            if batch is None:
+                inbox.put(_DONE)
+                return
+            start = time.perf_counter()
+            try:
+                outputs = stage.process(batch) or []
+                failed = False
+            except Exception as e:
+                print(f"Error in pipeline stage {stage.name}: {e}")
+                outputs, failed = [], True
+            stage.stats.record(len(batch), len(outputs), time.perf_counter() - start, failed)
+            self._emit(outputs, outbox, on_output)
+
+    def _emit(self, outputs, outbox, on_output):
+        for item in outputs:
+            if outbox is not None:
+                outbox.put(item)  # blocks while the next stage is saturated
+            elif on_output:
+                on_output(item)
+
+    def _finish(self, stage: Stage, outbox, on_output):
+        start = time.perf_counter()
+        try:
+            outputs = stage.finish() or []
+            failed = False
+        except Exception as e:
+            print(f"Error finishing pipeline stage {stage.name}: {e}")
+            outputs, failed = [], True
+        stage.stats.record(0, len(outputs), time.perf_counter() - start, failed)
+        self._emit(outputs, outbox, on_output)
+
+    def run(self, source, on_output=None) -> list:
+        """Feed items from source through every stage; returns per-stage stats when all are drained."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        workers = []
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            threads = [
+                threading.Thread(target=self._work, args=(stage, queues[index], outbox, on_output),
+                                 name=f"pipeline-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            workers.append(threads)
+
+        for item in source:
+            queues[0].put(item)
+        queues[0].put(_DONE)
+
+        # A stage's input ends once every worker of the previous stage (and its finish step) is done
+        for index, threads in enumerate(workers):
+            for thread in threads:
+                thread.join()
+            stage = self.stages[index]
+            if stage.finish is not None:
+                self._finish(stage, queues[index + 1] if index + 1 < len(queues) else None, on_output)
+            if index + 1 < len(queues):
+                queues[index + 1].put(_DONE)
+
+        return [stage.stats.as_dict() for stage in self.stages]
+
+
+def _decided(decisions, key="application_id"):
+    return {decision.get(key): decision for decision in decisions if isinstance(decision, dict)}
+
+
+def build_admission_stages(workers=None, batch_sizes=None):
+    """
+    The admission lifecycle as pipeline stages backed by the process-wide agents.
+
+    Each stage persists its status changes for the batch in bulk before passing survivors on.
+    Loan allocation is the exception: the loans stage only collects shortlisted students and
+    allocates the budget once shortlisting has drained, so need-score ranking covers the cohort.
+    """
+    from backend.utils.loan_allocation import run_allocation
+    from backend.utils.services import get_agent
+
+    workers = workers or {}
+    batch_sizes = batch_sizes or {}
+    officer = get_agent("admission_officer")
+    checker = get_agent("document_checker")
+    shortlister = get_agent("shortlisting_agent")
+    counsellor = get_agent("student_counsellor")
+
+    def screening(applications):
+        decisions, _ = officer.screen_batch(applications)
+        # Applications needing manual review stay "submitted" and leave the pipeline here
+        return [meta for meta in officer.record_decisions(applications, decisions)
+                if meta["status"] == ApplicationStatus.UNDER_REVIEW.value]
+
+    def documents(applications):
+        reports = _decided(checker.verify_records(applications))
+        complete = [app for app in applications
+                    if reports.get(app["id"], {}).get("overall_status") == "complete"]
+        return update_statuses("applications", [(app, ApplicationStatus.DOCUMENTS_VERIFIED, None)
+                                                for app in complete])
+
+    def shortlisting(applications):
+        decisions = shortlister.shortlist_batch(applications)
+        return [meta for meta in shortlister.record_decisions(applications, decisions)
+                if meta["status"] == ApplicationStatus.SHORTLISTED.value]
+
+    shortlisted_students = []
+    students_lock = threading.Lock()
+
+    def loans(applications):
+        with students_lock:
+            shortlisted_students.extend(app["student_id"] for app in applications if app.get("student_id"))
+        return applications
+
+    def allocate_loans():
+        loan_requests = []
+        for start in range(0, len(shortlisted_students), LOAN_QUERY_BATCH):
+            batch = shortlisted_students[start:start + LOAN_QUERY_BATCH]
+            data = get_collection("loan_requests").get(
+                where={"$and": [{"student_id": {"$in": batch}}, {"status": "requested"}]}, include=["metadatas"]
+            )
+            loan_requests.extend(dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"]))
+        if loan_requests:
+            run_allocation(loan_requests)
+        return []
+
+    def notification(applications):
+        counsellor.communicate_bulk([app.get("student_id") for app in applications if app.get("student_id")],
+                                    ApplicationStatus.SHORTLISTED.value)
+        return applications
+
+    specs = [
+        ("screening", screening, 50, None),
+        ("documents", documents, 50, None),
+        ("shortlisting", shortlisting, 25, None),
+        ("loans", loans, 50, allocate_loans),
+        ("notification", notification, 100, None),
+    ]
+    return [
+        Stage(name, process, workers=workers.get(name, 1), batch_size=batch_sizes.get(name, default_batch),
+              finish=finish)
+        for name, process, default_batch, finish in specs
+    ]
+
+
+def submitted_applications(page_size: int = 500):
+    """
+    Yield submitted application metadatas page by page.
+
+    The ids are pinned up front because the screening stage moves records out of "submitted"
+    while the source is still reading, which would make offset paging skip records.
+    """
+    for page in iter_pinned_pages("applications", page_size, where={"status": ApplicationStatus.SUBMITTED.value}):
+        for meta in page:
+            if meta.get("status") == ApplicationStatus.SUBMITTED.value:
+                yield meta
+
+
+def run_admission_pipeline(workers=None, batch_sizes=None, queue_size: int = 256, page_size: int = 500):
+    """Stream every submitted application through the admission stages. Returns per-stage stats."""
+    stages = build_admission_stages(workers, batch_sizes)
+    return Pipeline(stages, queue_size).run(submitted_applications(page_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run submitted applications through the admission pipeline.")
+    for name in ("screening", "documents", "shortlisting", "loans", "notification"):
+        parser.add_argument(f"--{name}-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=256)
+    args = parser.parse_args()
+
+    workers = {name: getattr(args, f"{name}_workers")
+               for name in ("screening", "documents", "shortlisting", "loans", "notification")}
+    print(json.dumps(run_admission_pipeline(workers, queue_size=args.queue_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# prescreen.py (deterministic rule-based application pre-screen)
+
+import numpy as np
+
+# Per-income-category cutoffs on the lower of marks_10/marks_12.
+# Below "reject_below" is ineligible, at or above "accept_at" is eligible,
+# anything in between is the borderline band forwarded to the LLM.
+DEFAULT_CUTOFFS = {
+    "default": {"reject_below": 45, "accept_at": 80},
+    "general": {"reject_below": 50, "accept_at": 85},
+    "obc": {"reject_below": 45, "accept_at": 80},
+    "ews": {"reject_below": 45, "accept_at": 80},
+    "sc/st": {"reject_below": 40, "accept_at": 75},
+}
+
+MANDATORY_FIELDS = ["student_id", "marks_10", "marks_12", "aadhar_no", "income_category"]
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def prescreen_applications(applications, cutoffs=None, mandatory_fields=None):
+    """
+    Split applications into deterministic decisions and a borderline band.
+
+    Returns (decisions, borderline) where decisions is a list of
+    {"application_id", "student_name", "status", "reason"} dicts for clear
+    passes/fails and borderline is the list of application metadatas that
+    still need LLM review.
+    """
+    if not applications:
+        return [], []
+
+    cutoffs = {key.lower(): value for key, value in (cutoffs or DEFAULT_CUTOFFS).items()}
+    mandatory_fields = mandatory_fields if mandatory_fields is not None else MANDATORY_FIELDS
+    default = cutoffs.get("default", DEFAULT_CUTOFFS["default"])
+
+    # Columnarize the metadatas once, then evaluate every rule as an array op
+    categories = np.array([str(app.get("income_category") or "").strip().lower() for app in applications])
+    marks_10 = np.array([_to_float(app.get("marks_10")) for app in applications])
+    marks_12 = np.array([_to_float(app.get("marks_12")) for app in applications])
+
+    missing = np.zeros(len(applications), dtype=bool)
+    for name in mandatory_fields:
+        missing |= np.array([_is_blank(app.get(name)) for app in applications])
+    missing |= np.isnan(marks_10) | np.isnan(marks_12)
+
+    reject_below = np.full(len(applications), float(default["reject_below"]))
+    accept_at = np.full(len(applications), float(default["accept_at"]))
+    for category, limits in cutoffs.items():
+        mask = categories == category
+        reject_below[mask] = limits["reject_below"]
+        accept_at[mask] = limits["accept_at"]
+
+    min_marks = np.fmin(marks_10, marks_12)
+    with np.errstate(invalid="ignore"):
+        ineligible = missing | (min_marks < reject_below)
+        eligible = ~ineligible & (min_marks >= accept_at)
+    borderline_mask = ~(ineligible | eligible)
+
+    decisions = []
+    for idx in np.flatnonzero(ineligible | eligible):
+        app = applications[idx]
+        if missing[idx]:
+            absent = [name for name in mandatory_fields if _is_blank(app.get(name))]
+            reason = f"Missing mandatory fields: {', '.join(absent) or 'marks'}."
+        elif ineligible[idx]:
+            reason = f"Marks ({min_marks[idx]:g}) below the cutoff of {reject_below[idx]:g} for this category."
+        else:
+            reason = f"Marks ({min_marks[idx]:g}) meet the automatic eligibility cutoff of {accept_at[idx]:g}."
+        decisions.append({
+            "application_id": app.get("id"),
+            "student_name": app.get("student_name", ""),
+            "status": "ineligible" if ineligible[idx] else "eligible",
+            "reason": reason
+        })
+
+    borderline = [applications[idx] for idx in np.flatnonzero(borderline_mask)]
+    return decisions, borderline
@@ -0,0 +1,92 @@
+# prompt_encoding.py (compact tabular encoding of records for bulk LLM prompts)
+#
+# Records are projected onto the fields an agent actually needs and written as a table:
+# a header line with the field names, then one delimiter-separated row per record. Compared
+# with repr() of metadata dicts this drops repeated key names, quotes and unused fields.
+
+from backend.utils.llm_backend import estimate_tokens
+
+DELIMITER = "|"
+
+# Fields each bulk prompt needs, in column order (the first column identifies the record)
+PROMPT_FIELDS = {
+    "screening": ["id", "student_name", "marks_10", "marks_12", "income_category", "documents"],
+    "shortlisting": ["id", "student_name", "marks_10", "marks_12", "income_category", "documents",
+                     "extracurriculars", "special_notes"],
+    "loan_reasons": ["loan_id", "status", "approved_amount", "need_score"],
+}
+
+# Sentence placed before the table so the model knows how to read it
+TABLE_HINT = f"One record per line, fields separated by '{DELIMITER}'; the first line is the header."
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (list, tuple, set)):
+        value = ",".join(str(item) for item in value)
+    return str(value).replace(DELIMITER, "/").replace("\r", " ").replace("\n", " ")
+
+
+def present_fields(records, fields):
+    """Requested fields that at least one record has a value for (keeps the table narrow)."""
+    return [name for name in fields if any(record.get(name) not in (None, "") for record in records)]
+
+
+def encode_row(record: dict, fields) -> str:
+    return DELIMITER.join(_cell(record.get(name)) for name in fields)
+
+
+def encode_records(records, fields) -> str:
+    """Header plus one row per record, restricted to fields present in the records."""
+    columns = present_fields(records, fields)
+    return "\n".join([DELIMITER.join(columns)] + [encode_row(record, columns) for record in records])
+
+
+def encode_for(prompt: str, records) -> str:
+    """Encode records with the field set registered for a prompt in PROMPT_FIELDS."""
+    return encode_records(records, PROMPT_FIELDS[prompt])
+
+
+def row_serializer(prompt: str):
+    """Serializer for chunk_by_token_budget that measures records the way they will be sent."""
+    fields = PROMPT_FIELDS[prompt]
+    return lambda record: encode_row(record, fields)
+
+
+def parse_table(text: str):
+    """
+    Read back the first table in a prompt: (columns, rows as dicts).
+
+    A table is a header line containing the delimiter and an id-like first column, followed by
+    rows with the same number of cells. Returns ([], []) if no table is found.
+    """
+    lines = text.splitlines()
+    for start, line in enumerate(lines):
+        columns = [cell.strip() for cell in line.split(DELIMITER)]
+        if len(columns) < 2 or not (columns[0] == "id" or columns[0].endswith("_id")):
+            continue
+        rows = []
+        for row in lines[start + 1:]:
+            cells = [cell.strip() for cell in row.split(DELIMITER)]
+            if len(cells) != len(columns):
+                break
+            rows.append(dict(zip(columns, cells)))
+        return columns, rows
+    return [], []
+
+
+def token_savings(records, fields) -> dict:
+    """Estimated prompt tokens of repr() versus the compact table for the same records."""
+    verbose = estimate_tokens(repr(list(records)))
+    compact = estimate_tokens(encode_records(records, fields))
+    return {
+        "records": len(records),
+        "repr_tokens": verbose,
+        "compact_tokens": compact,
+        "saved_pct": round(100.0 * (verbose - compact) / verbose, 1) if verbose else 0.0
+    }
@@ -0,0 +1,97 @@
+# services.py (lazy, on-first-use initialization of agents and clients)
+#
+# Importing this module is cheap: crewai, langchain and chromadb are only imported when an
+# agent or collection is first needed, or when warm_up() runs in the background at startup.
+
+import importlib
+import threading
+import time
+
+# Agent name -> (module, class); imported and instantiated on first use
+AGENT_CLASSES = {
+    "admission_officer": ("backend.agents.admisson_officer_agent", "AdmissionOfficerAgent"),
+    "document_checker": ("backend.agents.document_checking_agent", "DocumentCheckingAgent"),
+    "shortlisting_agent": ("backend.agents.shortlisting_agent", "ShortlistingAgent"),
+    "student_counsellor": ("backend.agents.student_counsellor", "StudentCounsellorAgent"),
+    "loan_agent": ("backend.agents.studen_loan_agent", "StudentLoanAgent"),
+}
+
+# Modules the API routes use lazily; imported during warm-up so first requests don't pay for it
+WARM_MODULES = [
+    "backend.data.admission_status",
+    "backend.data.bulk_ingest",
+    "backend.utils.chat_stream",
+]
+
+_agents = {}
+_lock = threading.RLock()
+_collections_ready = False
+_readiness = {"ready": False, "warming": False, "error": None, "warm_up_s": None, "agents": []}
+# Guards only _readiness; never held while importing or constructing anything, so the
+# readiness endpoint cannot wait behind warm-up
+_readiness_lock = threading.Lock()
+
+
+def ensure_collections():
+    """Create the ChromaDB collections once per process."""
+    global _collections_ready
+
+    if not _collections_ready:
+        with _lock:
+            if not _collections_ready:
+                from backend.data.database import initialize_collections
+                initialize_collections()
+                _collections_ready = True
+
+
+def get_agent(name: str):
+    """Return the process-wide agent instance, importing and constructing it on first use."""
+    agent = _agents.get(name)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(name)
+            if agent is None:
+                ensure_collections()
+                module_name, class_name = AGENT_CLASSES[name]
+                agent = getattr(importlib.import_module(module_name), class_name)()
+                _agents[name] = agent
+                with _readiness_lock:
+                    _readiness["agents"] = sorted(_agents)
+    return agent
+
+
+def call_agent(name: str, method: str, *args, **kwargs):
+    """Resolve an agent and call one of its methods (meant to run on a worker thread)."""
+    return getattr(get_agent(name), method)(*args, **kwargs)
+
+
+def warm_up():
+    """Import dependencies, create collections and construct every agent. Safe to call repeatedly."""
+    with _readiness_lock:
+        if _readiness["ready"] or _readiness["warming"]:
+            return dict(_readiness)
+        _readiness["warming"] = True
+
+    start = time.perf_counter()
+    try:
+        ensure_collections()
+        for module_name in WARM_MODULES:
+            importlib.import_module(module_name)
+        for name in AGENT_CLASSES:
+            get_agent(name)
+        with _readiness_lock:
+            _readiness.update(ready=True, error=None, warm_up_s=round(time.perf_counter() - start, 3))
+    except Exception as e:
+        print(f"Error warming up services: {e}")
+        with _readiness_lock:
+            _readiness["error"] = str(e)
+    finally:
+        with _readiness_lock:
+            _readiness["warming"] = False
+    return readiness()
+
+
+def readiness():
+    """Snapshot of the warm-up state for the readiness endpoint (never blocks on warm-up)."""
+    with _readiness_lock:
+        return dict(_readiness)
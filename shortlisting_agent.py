@@ -1,15 +1,49 @@
-from crewai import Agent, Task
-from langchain.tools import Tool
-from backend.utils.gemini_client import get_gemini_client
+import json
+import time
+from crewai import Agent
+from backend.agents.agent_registry import TaskTemplate, agent_tool, get_crew_agent
+from backend.utils.llm_backend import get_llm_client
+from backend.utils.prompt_encoding import TABLE_HINT, encode_for, row_serializer
+from backend.utils.decision_stream import DecisionError, decision_to_dict, iter_decisions
+from backend.utils.chunking import chunk_by_token_budget, dispatch_chunks, merge_decisions
+from backend.utils.metrics import instrument_tool
+from backend.utils.jobs import report_progress
+from backend.data.admission_status import update_statuses
 from backend.data.database import get_collection
+from backend.data.model import ApplicationStatus
+from backend.data.pagination import iter_pinned_pages
+from backend.data.watermark import changed_since, get_watermark, latest_change, next_watermark, set_watermark
+
+
+SHORTLISTING_TASK = TaskTemplate(
+    description="""Evaluate student applications for shortlisting.
+            Consider:
+            - Academic performance
+            - Extracurricular activities
+            - Compliance with eligibility criteria
+
+            Decide if each student should be shortlisted. Justify each decision.
+            Return a structured JSON list.
+            """,
+    expected_output="A list of shortlisted and rejected applications with reasons."
+)
 
 
 class ShortlistingAgent:
     def __init__(self):
-        self.gemini = get_gemini_client()
+        self.gemini = get_llm_client()
+        # Token budget for the applications part of each prompt, and concurrent LLM calls
+        self.chunk_token_budget = 6000
+        self.max_workers = 4
+        self.page_size = 1000
+        # Optional callback(decision_dict), called from worker threads as decisions stream in
+        self.on_decision = None
 
     def get_agent(self):
-        """Return the CrewAI agent responsible for application shortlisting."""
+        """Return the CrewAI agent responsible for application shortlisting (built once per process)."""
+        return get_crew_agent("shortlisting_agent", self._build_agent)
+
+    def _build_agent(self):
         return Agent(
             role="Application Shortlisting Agent",
             goal="Screen applications and shortlist candidates based on eligibility criteria.",
@@ -18,8 +52,9 @@ class ShortlistingAgent:
             verbose=True,
             allow_delegation=False,
             tools=[
-                Tool.from_function(
-                    func=self.shortlist_applications,
+                agent_tool(
+                    "shortlisting_agent",
+                    self.shortlist_applications,
                     name="ShortlistApplications",
                     description="Screen applications and determine which candidates should be shortlisted."
                 )
@@ -28,26 +63,80 @@ class ShortlistingAgent:
 
     def create_shortlisting_task(self):
         """Create a task for screening and shortlisting applications"""
-        return Task(
-            description="""Evaluate student applications for shortlisting.
-            Consider:
-            - Academic performance
-            - Extracurricular activities
-            - Compliance with eligibility criteria
+        return SHORTLISTING_TASK.bind(self.get_agent())
 
-            Decide if each student should be shortlisted. Justify each decision.
-            Return a structured JSON list.
-            """,
-            expected_output="A list of shortlisted and rejected applications with reasons.",
-            agent=self.get_agent()
-        )
+    @instrument_tool("shortlisting_agent")
+    def shortlist_applications(self, *, full_rerun: bool = False):
+        """Tool to analyze and shortlist applications using eligibility criteria
 
-    def shortlist_applications(self):
-        """Tool to analyze and shortlist applications using eligibility criteria"""
+        Only applications with verified documents that changed since the last successful run are
+        evaluated unless full_rerun is set. Decisions are saved page by page as status changes, so
+        decided applications leave the filter and are not evaluated again.
+        """
         try:
-            applications = get_collection("applications").get()["metadatas"]
+            watermark = 0.0 if full_rerun else get_watermark("shortlisting_agent")
+            started_at = time.time()
+            decisions, latest = [], watermark
+            where = changed_since({"status": ApplicationStatus.DOCUMENTS_VERIFIED.value}, watermark)
+            # Walk the changed applications page by page instead of loading them all at once
+            for applications in iter_pinned_pages("applications", self.page_size, where=where):
+                applications = [app for app in applications
+                                if app.get("status") == ApplicationStatus.DOCUMENTS_VERIFIED.value]
+                chunks = chunk_by_token_budget(applications, self.chunk_token_budget, row_serializer("shortlisting"))
+                results = dispatch_chunks(chunks, self.shortlist_batch, self.max_workers)
+                page_decisions = merge_decisions(applications, results)
+                self.record_decisions(applications, page_decisions)
+                decisions.extend(page_decisions)
+                report_progress(applications_processed=len(decisions))
+                latest = latest_change(applications, latest)
+            if not decisions:
+                return "No applications to shortlist."
+
+            # Batches that failed are retried next run, so only advance when everything was decided
+            if not any(decision.get("status") == "needs_review" for decision in decisions):
+                set_watermark("shortlisting_agent", next_watermark(watermark, latest, started_at))
 
-            response = self.gemini.generate_content(
+            return json.dumps(decisions)
+
+        except Exception as e:
+            print(f"Error during shortlisting: {e}")
+            return f"Shortlisting failed: {str(e)}"
+
+    def record_decisions(self, applications, decisions):
+        """Save shortlisted/rejected decisions as status changes. Returns the updated metadatas."""
+        decided = {d.get("application_id"): d for d in decisions if isinstance(d, dict)}
+        updates = []
+        for app in applications:
+            status = str(decided.get(app["id"], {}).get("status", "")).lower()
+            if status in (ApplicationStatus.SHORTLISTED.value, ApplicationStatus.REJECTED.value):
+                updates.append((app, status, {"shortlisted_by": "shortlisting_agent"}))
+        return update_statuses("applications", updates)
+
+    @instrument_tool("shortlisting_agent")
+    def shortlist_application(self, application_id: str):
+        """Shortlist a single application, whatever the shortlisting watermark says."""
+        try:
+            data = get_collection("applications").get(ids=[application_id])
+            if not data["metadatas"]:
+                return f"Error: application {application_id} not found."
+            application = dict(data["metadatas"][0], id=application_id)
+            decisions = self.shortlist_batch([application])
+            self.record_decisions([application], decisions)
+            return json.dumps(decisions)
+        except Exception as e:
+            print(f"Error during shortlisting: {e}")
+            return f"Shortlisting failed: {str(e)}"
+
+    def shortlist_batch(self, applications):
+        """Shortlist one token-budgeted batch of applications.
+
+        Decisions are parsed from the LLM stream as each one completes (and passed to
+        on_decision if set); applications without a valid decision are marked needs_review.
+        """
+        names = {app.get("id"): app.get("student_name", "") for app in applications}
+        decisions = {}
+        try:
+            stream = self.gemini.generate_content(
                 f"""You are reviewing student applications for university admission.
 
                 Each application contains:
@@ -73,13 +162,31 @@ class ShortlistingAgent:
                   ...
                 ]
 
-                Applications:
-                {applications}
-                """
+                Applications ({TABLE_HINT}):
+                {encode_for("shortlisting", applications)}
+                """,
+                stream=True,
+                expect_json=True
             )
 
-            return response.text
-
+            for item in iter_decisions(stream):
+                if isinstance(item, DecisionError):
+                    print(f"Unreadable shortlisting decision #{item.index}: {item.error}")
+                    continue
+                if item.application_id not in names:
+                    continue
+                decision = dict(decision_to_dict(item), student_name=names[item.application_id])
+                decisions[item.application_id] = decision
+                if self.on_decision:
+                    self.on_decision(decision)
+            reason = "Automated review returned no valid decision for this application."
         except Exception as e:
-            print(f"Error during shortlisting: {e}")
-            return f"Shortlisting failed: {str(e)}"
\ No newline at end of file
+            print(f"Error during shortlisting batch: {e}")
+            reason = f"Shortlisting failed: {str(e)}"
+
+        return [decisions.get(app_id) or {
+            "application_id": app_id,
+            "student_name": name,
+            "status": "needs_review",
+            "reason": reason
+        } for app_id, name in names.items()]
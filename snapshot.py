@@ -0,0 +1,242 @@
+# snapshot.py (columnar snapshot of applications, students and loan_requests for analytics)
+#
+# Each refresh walks the collections page by page and writes one .npy file per column into a
+# new versioned directory, then atomically repoints CURRENT at it. Superseded versions are kept
+# for a while, because readers may still be memory-mapping them. Numeric columns are float64;
+# string columns are dictionary-encoded (int32 codes + a JSON list of values, -1 = missing).
+# Readers memory-map the files, so loading a snapshot costs almost nothing.
+#
+# Usage:
+#   python -m backend.data.snapshot --refresh
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from backend.data.pagination import iter_pages
+
+SNAPSHOT_DIR = os.environ.get("ANALYTICS_SNAPSHOT_DIR", "./analytics_snapshot")
+
+# Snapshots older than this (seconds) are rebuilt on the next get_snapshot() call
+SNAPSHOT_MAX_AGE = float(os.environ.get("ANALYTICS_SNAPSHOT_MAX_AGE", "300"))
+
+SNAPSHOT_PAGE_SIZE = 5000
+
+# Collection -> (numeric columns, categorical columns)
+SCHEMAS = {
+    "applications": (
+        ["marks_10", "marks_12", "updated_ts"],
+        ["id", "student_id", "status", "income_category"],
+    ),
+    "students": (
+        [],
+        ["id", "application_id"],
+    ),
+    "loan_requests": (
+        ["amount_requested", "approved_amount", "updated_ts"],
+        ["id", "student_id", "status"],
+    ),
+}
+
+_CURRENT = "CURRENT"
+_refresh_lock = threading.Lock()
+_cache = {"version": None, "snapshot": None}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Table:
+    """Memory-mapped columns of one collection."""
+
+    def __init__(self, path: str, numeric, categorical, rows: int):
+        self.rows = rows
+        self._path = path
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self._categories = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """Numeric values, or int32 codes for a categorical column."""
+        return np.load(os.path.join(self._path, f"{name}.npy"), mmap_mode="r")
+
+    def categories(self, name: str) -> list:
+        """Values behind the codes of a categorical column."""
+        if name not in self._categories:
+            with open(os.path.join(self._path, f"{name}.categories.json"), encoding="utf-8") as f:
+                self._categories[name] = json.load(f)
+        return self._categories[name]
+
+    def strings(self, name: str) -> np.ndarray:
+        """Decoded categorical column (missing values become empty strings)."""
+        values = np.array(self.categories(name) + [""], dtype=object)
+        return values[self.column(name)]
+
+    def code_of(self, name: str, value) -> int:
+        """Code for a value in a categorical column (-2 if absent, which matches nothing)."""
+        try:
+            return self.categories(name).index(value)
+        except ValueError:
+            return -2
+
+
+class Snapshot:
+    """One versioned snapshot: a Table per collection plus build information."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.path = path
+        self.version = self.manifest["version"]
+        self.created_at = self.manifest["created_at"]
+        self.tables = {
+            name: Table(os.path.join(path, name), info["numeric"], info["categorical"], info["rows"])
+            for name, info in self.manifest["tables"].items()
+        }
+
+    def __getitem__(self, name: str) -> Table:
+        return self.tables[name]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+def _write_table(path: str, collection_name: str, numeric, categorical, page_size: int) -> int:
+    os.makedirs(path)
+    numeric_parts = {name: [] for name in numeric}
+    code_parts = {name: [] for name in categorical}
+    dictionaries = {name: {} for name in categorical}
+    rows = 0
+
+    for page in iter_pages(collection_name, page_size):
+        rows += len(page)
+        for name in numeric:
+            numeric_parts[name].append(np.fromiter((_to_float(r.get(name)) for r in page), dtype=np.float64,
+                                                   count=len(page)))
+        for name in categorical:
+            lookup = dictionaries[name]
+            codes = np.empty(len(page), dtype=np.int32)
+            for i, record in enumerate(page):
+                value = record.get(name)
+                if value is None or value == "":
+                    codes[i] = -1
+                else:
+                    codes[i] = lookup.setdefault(str(value), len(lookup))
+            code_parts[name].append(codes)
+
+    for name in numeric:
+        np.save(os.path.join(path, f"{name}.npy"),
+                np.concatenate(numeric_parts[name]) if rows else np.empty(0, dtype=np.float64))
+    for name in categorical:
+        np.save(os.path.join(path, f"{name}.npy"),
+                np.concatenate(code_parts[name]) if rows else np.empty(0, dtype=np.int32))
+        with open(os.path.join(path, f"{name}.categories.json"), "w", encoding="utf-8") as f:
+            json.dump(list(dictionaries[name]), f)
+    return rows
+
+
+def _prune(base_dir: str, current: str, keep_seconds: float):
+    """
+    Remove superseded snapshots that no reader should still be using.
+
+    The newest superseded version and any created within keep_seconds are kept. Directories
+    without a manifest are builds still in progress (possibly in another process) and are
+    never touched.
+    """
+    built = []
+    for entry in os.listdir(base_dir):
+        manifest = os.path.join(base_dir, entry, "manifest.json")
+        if entry == current or not os.path.isfile(manifest):
+            continue
+        try:
+            with open(manifest, encoding="utf-8") as f:
+                built.append((float(json.load(f)["created_at"]), entry))
+        except (OSError, ValueError, KeyError):
+            continue
+
+    cutoff = time.time() - keep_seconds
+    for created_at, entry in sorted(built)[:-1]:
+        if created_at < cutoff:
+            shutil.rmtree(os.path.join(base_dir, entry), ignore_errors=True)
+
+
+def refresh_snapshot(base_dir: str = SNAPSHOT_DIR, page_size: int = SNAPSHOT_PAGE_SIZE) -> Snapshot:
+    """Build a new snapshot from the collections and make it current. Old, unused snapshots are removed."""
+    with _refresh_lock:
+        start = time.time()
+        version = f"{int(start * 1000)}-{os.getpid()}"
+        path = os.path.join(base_dir, version)
+        try:
+            tables = {}
+            for name, (numeric, categorical) in SCHEMAS.items():
+                rows = _write_table(os.path.join(path, name), name, numeric, categorical, page_size)
+                tables[name] = {"rows": rows, "numeric": numeric, "categorical": categorical}
+
+            with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": version,
+                    "created_at": start,
+                    "build_seconds": round(time.time() - start, 3),
+                    "tables": tables
+                }, f)
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        pointer = os.path.join(base_dir, _CURRENT)
+        with open(pointer + f".{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer + f".{os.getpid()}.tmp", pointer)
+
+        _prune(base_dir, version, SNAPSHOT_MAX_AGE)
+
+        snapshot = Snapshot(path)
+        _cache.update(version=version, snapshot=snapshot)
+        return snapshot
+
+
+def load_snapshot(base_dir: str = SNAPSHOT_DIR):
+    """The current snapshot, or None if none has been built yet."""
+    try:
+        with open(os.path.join(base_dir, _CURRENT), encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if _cache["version"] != version:
+        _cache.update(version=version, snapshot=Snapshot(os.path.join(base_dir, version)))
+    return _cache["snapshot"]
+
+
+def get_snapshot(max_age: float = SNAPSHOT_MAX_AGE, base_dir: str = SNAPSHOT_DIR) -> Snapshot:
+    """Current snapshot, rebuilt first if it is missing or older than max_age seconds."""
+    snapshot = load_snapshot(base_dir)
+    if snapshot is None or snapshot.age > max_age:
+        snapshot = refresh_snapshot(base_dir)
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar analytics snapshot.")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the snapshot from the collections")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    snapshot = refresh_snapshot(args.dir) if args.refresh else load_snapshot(args.dir)
+    if snapshot is None:
+        print("No snapshot found; run with --refresh.")
+        return
+    print(json.dumps(snapshot.manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,116 @@
-from crewai import Agent, Task
-from langchain.tools import Tool
-from backend.utils.gemini_client import get_gemini_client
+import json
+import time
+from crewai import Agent
+from backend.agents.agent_registry import TaskTemplate, agent_tool, get_crew_agent
+from backend.utils.llm_backend import get_llm_client, parse_json_response
+from backend.utils.prompt_encoding import TABLE_HINT, encode_for, row_serializer
+from backend.utils.chunking import chunk_by_token_budget, dispatch_chunks
+from backend.utils.loan_allocation import run_allocation
+from backend.utils.metrics import instrument_tool
 from backend.data.database import get_collection
+from backend.data.watermark import changed_since, get_watermark, latest_change, next_watermark, set_watermark
+
+
+LOAN_TASK = TaskTemplate(
+    description="""Review all student loan requests and decide to approve or reject based on:
+            - Need and justification
+            - Budget availability
+            - Request amount vs average tuition
+
+            Return a JSON list of decisions with reasons.""",
+    expected_output="List of approved/rejected loans with reasons and approved amounts."
+)
 
 
 class StudentLoanAgent:
     def __init__(self):
-        self.gemini = get_gemini_client()
+        self.gemini = get_llm_client()
+        # Let the LLM phrase decision reasons (amounts are never taken from it)
+        self.llm_reasons = True
+        self.reason_token_budget = 6000
+        self.max_workers = 4
+
+    @instrument_tool("loan_agent")
+    def process_loan_requests(self, *, full_rerun: bool = False):
+        """Allocate the loan budget across requested loans changed since the last successful run.
 
-    def process_loan_requests(self):
+        Approvals and amounts come from the deterministic allocation engine, which also
+        decrements the budget; the LLM only writes the reasons.
+        """
         try:
+            watermark = 0.0 if full_rerun else get_watermark("loan_agent")
+            started_at = time.time()
             loan_collection = get_collection("loan_requests")
-            budget_collection = get_collection("university_budget")
 
-            loan_requests = loan_collection.get(where={"status": "requested"})["metadatas"]
-            budget_data = budget_collection.get(where={"type": "loan"})["metadatas"]
+            loan_requests = loan_collection.get(where=changed_since({"status": "requested"}, watermark))["metadatas"]
+            if not loan_requests:
+                return "No loan requests to process."
 
-            if not budget_data:
-                return "Loan budget information is missing."
+            try:
+                decisions, _ = run_allocation(loan_requests)
+            except LookupError as e:
+                return str(e)
+            set_watermark("loan_agent", next_watermark(watermark, latest_change(loan_requests, watermark), started_at))
+            if not decisions:
+                return "No loan requests to process."
 
-            remaining_budget = budget_data[0].get("remaining_budget", 0)
+            if self.llm_reasons:
+                self._write_reasons(decisions)
 
-            response = self.gemini.generate_content(
-                f"""You are reviewing the following student loan requests for approval.
-                University's total loan budget available: {remaining_budget}.
+            return json.dumps(decisions)
+        except Exception as e:
+            return f"Error during loan processing: {e}"
 
-                Each loan request contains:
-                - Student ID
-                - Amount requested
-                - Purpose
-                - Evaluation notes (if any)
+    def _write_reasons(self, decisions):
+        """Ask the LLM to explain the allocated decisions and store its reasons as evaluation notes."""
+        summaries = [
+            {key: decision[key] for key in ("loan_id", "status", "approved_amount", "need_score")}
+            for decision in decisions
+        ]
+        chunks = chunk_by_token_budget(summaries, self.reason_token_budget, row_serializer("loan_reasons"))
+        results = dispatch_chunks(chunks, self._reason_chunk, self.max_workers)
+        known = {decision["loan_id"] for decision in decisions}
+        reasons = {item.get("loan_id"): item.get("reason") for result in results for item in result
+                   if isinstance(item, dict) and item.get("reason") and item.get("loan_id") in known}
+        if not reasons:
+            return
 
-                Decide whether to APPROVE or REJECT each loan based on:
-                1. Need and justification
-                2. Requested amount vs. average tuition
-                3. Total available budget
+        for decision in decisions:
+            decision["reason"] = reasons.get(decision["loan_id"], decision["reason"])
+        ids = list(reasons)
+        get_collection("loan_requests").update(ids=ids, metadatas=[{"evaluation_notes": reasons[i]} for i in ids])
+
+    def _reason_chunk(self, summaries):
+        try:
+            response = self.gemini.generate_content(
+                f"""The following student loan decisions have already been made by the university's
+                allocation engine (higher need_score means greater financial need and merit).
+                Do NOT change any decision or amount. Write a short, respectful reason for each one.
 
                 Return a JSON list like:
                 [
                   {{
                     "loan_id": "...",
-                    "status": "approved/rejected",
-                    "approved_amount": ...,
                     "reason": "..."
                   }},
                   ...
                 ]
 
-                Loan Requests:
-                {loan_requests}
-                """
+                Decisions ({TABLE_HINT}):
+                {encode_for("loan_reasons", summaries)}
+                """,
+                expect_json=True
             )
-
-            return response.text
+            reasons = parse_json_response(response.text)
+            return reasons if isinstance(reasons, list) else []
         except Exception as e:
-            return f"Error during loan processing: {e}"
+            print(f"Error writing loan decision reasons: {e}")
+            return []
 
     def get_agent(self):
+        return get_crew_agent("loan_agent", self._build_agent)
+
+    def _build_agent(self):
         return Agent(
             role="Student Loan Officer",
             goal="Evaluate and process student loan requests based on eligibility and budget constraints.",
@@ -65,8 +119,9 @@ class StudentLoanAgent:
             verbose=True,
             allow_delegation=False,
             tools=[
-                Tool.from_function(
-                    func=self.process_loan_requests,
+                agent_tool(
+                    "loan_agent",
+                    self.process_loan_requests,
                     name="ProcessLoanRequests",
                     description="Evaluates all loan requests and determines approval based on eligibility and budget."
                 )
@@ -74,13 +129,4 @@ class StudentLoanAgent:
         )
 
     def create_loan_task(self):
-        return Task(
-            description="""Review all student loan requests and decide to approve or reject based on:
-            - Need and justification
-            - Budget availability
-            - Request amount vs average tuition
-
-            Return a JSON list of decisions with reasons.""",
-            expected_output="List of approved/rejected loans with reasons and approved amounts.",
-            agent=self.get_agent()
-        )
+        return LOAN_TASK.bind(self.get_agent())
@@ -1,15 +1,72 @@
-from crewai import Agent, Task
-from langchain.tools import Tool
-from backend.utils.gemini_client import get_gemini_client
+import re
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from crewai import Agent
+from backend.agents.agent_registry import TaskTemplate, agent_tool, get_crew_agent
+from backend.utils.llm_backend import get_llm_client
+from backend.utils.metrics import instrument_tool
 from backend.data.database import get_collection
 
 
+COMMUNICATION_TASK = TaskTemplate(
+    description="""Send an update to student with ID {student_id} about their current admission stage: '{admission_stage}'.
+
+            Ensure the message is friendly, clear, and informative. Include:
+            - A brief explanation of the current stage
+            - Any required actions from the student
+            - Contact info for further help
+            """,
+    expected_output="A well-written message ready to send to the student."
+)
+
+
+DEFAULT_LANGUAGE = "en"
+
+# Student fields a bulk message template may reference
+TEMPLATE_FIELDS = ["name", "student_id", "application_id", "stage"]
+
+# Used when the LLM template is unusable
+DEFAULT_TEMPLATE = """Dear {name},
+
+Your admission status has been updated to: {stage}.
+Please log in to the admission portal for details and any next steps.
+If you have questions, feel free to contact your student counsellor.
+
+Application ID: {application_id}"""
+
+# Students fetched and logs written per Chroma call in bulk mode
+BULK_BATCH_SIZE = 1000
+
+_PLACEHOLDER = re.compile(r"\{(" + "|".join(TEMPLATE_FIELDS) + r")\}")
+
+
+def fill_template(template: str, student: dict, admission_stage: str) -> str:
+    """Substitute the known placeholders; any other braces in the template are left alone."""
+    values = {
+        "name": student.get("name", ""),
+        "student_id": student.get("id", ""),
+        "application_id": student.get("application_id", ""),
+        "stage": admission_stage,
+    }
+    return _PLACEHOLDER.sub(lambda match: str(values[match.group(1)]), template)
+
+
 class StudentCounsellorAgent:
     def __init__(self):
-        self.gemini = get_gemini_client()
+        self.gemini = get_llm_client()
+        self.max_workers = 4
+        # (admission_stage, language) -> message template
+        self._templates = {}
+        self._templates_lock = threading.Lock()
+        self._pending_templates = {}
 
     def get_agent(self):
-        """Return the CrewAI agent responsible for student communication and guidance."""
+        """Return the CrewAI agent responsible for student communication and guidance (built once per process)."""
+        return get_crew_agent("student_counsellor", self._build_agent)
+
+    def _build_agent(self):
         return Agent(
             role="Student Counsellor",
             goal="Provide students with updates and support regarding their admission process.",
@@ -18,8 +75,9 @@ class StudentCounsellorAgent:
             verbose=True,
             allow_delegation=False,
             tools=[
-                Tool.from_function(
-                    func=self.communicate_with_student,
+                agent_tool(
+                    "student_counsellor",
+                    self.communicate_with_student,
                     name="CommunicateWithStudent",
                     description="Sends admission status updates and helpful information to a student."
                 )
@@ -28,38 +86,162 @@ class StudentCounsellorAgent:
 
     def create_communication_task(self, student_id, admission_stage):
         """Create a task to send a personalized communication message to a student"""
-        return Task(
-            description=f"""Send an update to student with ID {student_id} about their current admission stage: '{admission_stage}'.
-
-            Ensure the message is friendly, clear, and informative. Include:
-            - A brief explanation of the current stage
-            - Any required actions from the student
-            - Contact info for further help
-            """,
-            expected_output="A well-written message ready to send to the student.",
-            agent=self.get_agent()
-        )
+        return COMMUNICATION_TASK.bind(self.get_agent(), student_id=student_id, admission_stage=admission_stage)
 
+    @instrument_tool("student_counsellor")
     def communicate_with_student(self, student_id: str, admission_stage: str):
         """Tool to send personalized admission updates to a student"""
         try:
             student_collection = get_collection("students")
             student_data = student_collection.get(ids=[student_id])["metadatas"][0]
+            return self._personalized_message(dict(student_data, id=student_id), admission_stage)
+        except Exception as e:
+            print(f"Error communicating with student: {e}")
+            return f"Error generating message: {str(e)}"
 
-            response = self.gemini.generate_content(
-                f"""Write a message for student {student_data['name']} (ID: {student_id}).
+    def _personalized_message(self, student: dict, admission_stage: str) -> str:
+        notes = f"\n                Special notes on this student: {student['special_notes']}\n" \
+            if student.get("special_notes") else ""
+        language = student.get("language") or DEFAULT_LANGUAGE
+        response = self.gemini.generate_content(
+            f"""Write a message for student {student['name']} (ID: {student['id']}).
 
                 Their current admission stage is: {admission_stage}.
+                {notes}
+                Make the message:
+                - Friendly and supportive
+                - Clear about the current step in the process
+                - Include any actions the student needs to take
+                - Mention they can contact the counsellor if they have questions
+                - Written in language: {language}
+                """
+        )
+        return response.text
+
+    def message_template(self, admission_stage: str, language: str = DEFAULT_LANGUAGE) -> str:
+        """
+        LLM-written message template for a stage and language, generated once per process.
+
+        Generation runs outside the lock; concurrent callers for the same key wait on one shared call.
+        A failed or invalid generation returns DEFAULT_TEMPLATE without caching it, so the next call retries.
+        """
+        key = (admission_stage, language)
+        with self._templates_lock:
+            template = self._templates.get(key)
+            if template is not None:
+                return template
+            pending = self._pending_templates.get(key)
+            if pending is None:
+                pending = self._pending_templates[key] = Future()
+                generating = True
+            else:
+                generating = False
+        if not generating:
+            return pending.result()
+
+        template = None
+        try:
+            template = self._generate_template(admission_stage, language)
+        finally:
+            with self._templates_lock:
+                del self._pending_templates[key]
+                if template is not None:
+                    self._templates[key] = template
+            pending.set_result(template or DEFAULT_TEMPLATE)
+        return template or DEFAULT_TEMPLATE
+
+    def _generate_template(self, admission_stage: str, language: str):
+        """The generated template, or None if the call failed or the text has no {name} placeholder."""
+        placeholders = ", ".join("{" + name + "}" for name in TEMPLATE_FIELDS)
+        try:
+            response = self.gemini.generate_content(
+                f"""Write a message template for students whose admission stage is now: {admission_stage}.
+
+                Use these placeholders exactly where the student's details belong: {placeholders}.
+                Address the student with {{name}}. Do not use any other curly braces.
 
                 Make the message:
                 - Friendly and supportive
                 - Clear about the current step in the process
                 - Include any actions the student needs to take
                 - Mention they can contact the counsellor if they have questions
+                - Written in language: {language}
+
+                Return only the template text.
                 """
             )
+            template = response.text.strip()
+            if "{name}" in template:
+                return template
+            print(f"Message template for {admission_stage}/{language} has no {{name}} placeholder; using default.")
+        except Exception as e:
+            print(f"Error generating message template: {e}")
+        return None
+
+    @instrument_tool("student_counsellor")
+    def communicate_bulk(self, student_ids, admission_stage: str, medium: str = "email"):
+        """
+        Notify many students about the same admission stage.
+
+        Students are fetched in batches and messages are filled in locally from one template per
+        (stage, language); only students with special notes get an individual LLM message. All
+        messages are appended to communication_logs in bulk. Returns a summary dict.
+        """
+        summary = {"requested": 0, "sent": 0, "templated": 0, "personalized": 0, "missing": 0}
+        student_ids = list(dict.fromkeys(student_ids))
+        summary["requested"] = len(student_ids)
+        students = get_collection("students")
+        logs = get_collection("communication_logs")
+
+        for start in range(0, len(student_ids), BULK_BATCH_SIZE):
+            batch = student_ids[start:start + BULK_BATCH_SIZE]
+            data = students.get(ids=batch, include=["metadatas"])
+            records = [dict(meta, id=record_id) for record_id, meta in zip(data["ids"], data["metadatas"])]
+            summary["missing"] += len(batch) - len(records)
+
+            special = [record for record in records if record.get("special_notes")]
+            messages = {}
+            for record in records:
+                if not record.get("special_notes"):
+                    template = self.message_template(admission_stage, record.get("language") or DEFAULT_LANGUAGE)
+                    messages[record["id"]] = fill_template(template, record, admission_stage)
+            summary["templated"] += len(messages)
+
+            if special:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(special))) as pool:
+                    for record, message in zip(special, pool.map(
+                            lambda record: self._personalized_or_template(record, admission_stage), special)):
+                        messages[record["id"]] = message
+                summary["personalized"] += len(special)
+
+            if not records:
+                continue
+            now = datetime.now().isoformat()
+            log_ids = [str(uuid.uuid4()) for _ in records]
+            logs.add(
+                documents=log_ids,
+                metadatas=[{
+                    "id": log_id,
+                    "student_id": record["id"],
+                    "message": messages[record["id"]],
+                    "sent_by": "student_counsellor",
+                    "timestamp": now,
+                    "medium": medium,
+                    "admission_stage": admission_stage,
+                    "language": record.get("language") or DEFAULT_LANGUAGE,
+                    "response_required": False,
+                    "response_received": False
+                } for log_id, record in zip(log_ids, records)],
+                ids=log_ids
+            )
+            summary["sent"] += len(records)
+
+        return summary
 
-            return response.text
+    def _personalized_or_template(self, student: dict, admission_stage: str) -> str:
+        try:
+            return self._personalized_message(student, admission_stage)
         except Exception as e:
-            print(f"Error communicating with student: {e}")
-            return f"Error generating message: {str(e)}"
+            print(f"Error personalizing message for {student['id']}: {e}")
+            template = self.message_template(admission_stage, student.get("language") or DEFAULT_LANGUAGE)
+            return fill_template(template, student, admission_stage)
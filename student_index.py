@@ -0,0 +1,182 @@
+# student_index.py (case-folded name/email index over the students collection)
+
+import bisect
+import os
+import sqlite3
+import threading
+
+from backend.data.database import get_collection
+
+STUDENT_INDEX_PATH = os.environ.get("STUDENT_INDEX_PATH", "./student_index.sqlite3")
+
+# Chroma caps how many ids can be fetched in a single get()
+SYNC_BATCH_SIZE = 1000
+
+# Singleton to maintain a single index per process
+_student_index = None
+_index_lock = threading.Lock()
+
+
+def fold(value) -> str:
+    """Case-fold and trim a name or email for lookup."""
+    return str(value or "").strip().casefold()
+
+
+class StudentIndex:
+    """
+    In-memory name/email index backed by SQLite.
+
+    Exact lookups are dict hits; prefix lookups bisect a sorted list of name keys.
+    The SQLite table lets other processes (e.g. the admission form) publish new
+    students without the chatbot rescanning the collection.
+    """
+
+    def __init__(self, path: str = STUDENT_INDEX_PATH):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS student_index (
+                student_id TEXT PRIMARY KEY,
+                name_key TEXT NOT NULL,
+                email_key TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_student_name ON student_index(name_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_student_email ON student_index(email_key)")
+        self._conn.commit()
+        self._by_id = {}
+        self._by_name = {}
+        self._by_email = {}
+        self._sorted_names = []
+        for student_id, name_key, email_key in self._conn.execute(
+            "SELECT student_id, name_key, email_key FROM student_index"
+        ):
+            self._remember(student_id, name_key, email_key)
+
+    def _remember(self, student_id, name_key, email_key):
+        # Caller holds self._lock (or is __init__)
+        self._forget(student_id)
+        self._by_id[student_id] = (name_key, email_key)
+        if name_key:
+            if name_key not in self._by_name:
+                self._by_name[name_key] = []
+                bisect.insort(self._sorted_names, name_key)
+            self._by_name[name_key].append(student_id)
+        if email_key:
+            self._by_email[email_key] = student_id
+
+    def _forget(self, student_id):
+        entry = self._by_id.pop(student_id, None)
+        if entry is None:
+            return
+        name_key, email_key = entry
+        ids = self._by_name.get(name_key, [])
+        if student_id in ids:
+            ids.remove(student_id)
+        if name_key in self._by_name and not ids:
+            del self._by_name[name_key]
+            del self._sorted_names[bisect.bisect_left(self._sorted_names, name_key)]
+        if self._by_email.get(email_key) == student_id:
+            del self._by_email[email_key]
+
+    def add_student(self, metadata: dict):
+        """Index (or re-index) a student metadata record as written to the students collection."""
+        self.add_students([metadata])
+
+    def add_students(self, metadatas):
+        """Index many student metadata records in one transaction."""
+        rows = [(meta["id"], fold(meta.get("name")), fold(meta.get("email"))) for meta in metadatas]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO student_index (student_id, name_key, email_key) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            for row in rows:
+                self._remember(*row)
+
+    def remove_students(self, student_ids):
+        """Drop students from the index."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM student_index WHERE student_id = ?", [(sid,) for sid in student_ids])
+            self._conn.commit()
+            for student_id in student_ids:
+                self._forget(student_id)
+
+    def sync(self):
+        """
+        Incrementally reconcile the index with the students collection.
+
+        Only ids are listed from Chroma; metadata is fetched just for students the index has not seen.
+        """
+        collection = get_collection("students")
+        current_ids = set(collection.get(include=[])["ids"])
+        with self._lock:
+            known_ids = set(self._by_id)
+        missing = list(current_ids - known_ids)
+        stale = list(known_ids - current_ids)
+
+        for start in range(0, len(missing), SYNC_BATCH_SIZE):
+            batch = missing[start:start + SYNC_BATCH_SIZE]
+            data = collection.get(ids=batch, include=["metadatas"])
+            self.add_students([
+                {**(meta or {}), "id": student_id} for student_id, meta in zip(data["ids"], data["metadatas"])
+            ])
+        if stale:
+            self.remove_students(stale)
+        return {"added": len(missing), "removed": len(stale)}
+
+    def _load_from_store(self, column: str, key: str):
+        # Picks up students indexed by another process since this index was loaded
+        rows = self._conn.execute(
+            f"SELECT student_id, name_key, email_key FROM student_index WHERE {column} = ?", (key,)
+        ).fetchall()
+        for row in rows:
+            self._remember(*row)
+        return [row[0] for row in rows]
+
+    def find_by_name(self, name: str):
+        """Return the ids of students whose name matches exactly (case-insensitive)."""
+        key = fold(name)
+        with self._lock:
+            ids = self._by_name.get(key)
+            if ids is None:
+                ids = self._load_from_store("name_key", key)
+            return list(ids)
+
+    def find_by_email(self, email: str):
+        """Return the id of the student with this email (case-insensitive), or None."""
+        key = fold(email)
+        with self._lock:
+            student_id = self._by_email.get(key)
+            if student_id is None:
+                found = self._load_from_store("email_key", key)
+                student_id = found[0] if found else None
+            return student_id
+
+    def find_by_name_prefix(self, prefix: str, limit: int = 10):
+        """Return up to limit (name, student_id) pairs whose name starts with prefix."""
+        key = fold(prefix)
+        results = []
+        with self._lock:
+            idx = bisect.bisect_left(self._sorted_names, key)
+            while idx < len(self._sorted_names) and len(results) < limit:
+                name_key = self._sorted_names[idx]
+                if not name_key.startswith(key):
+                    break
+                results.extend((name_key, sid) for sid in self._by_name[name_key])
+                idx += 1
+        return results[:limit]
+
+
+def get_student_index():
+    """Get the process-wide student index, syncing it with the collection on first use."""
+    global _student_index
+
+    if _student_index is None:
+        with _index_lock:
+            if _student_index is None:
+                index = StudentIndex()
+                index.sync()
+                _student_index = index
+
+    return _student_index
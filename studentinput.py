@@ -7,10 +7,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import streamlit as st
 from datetime import datetime
 from backend.data.database import get_collection, initialize_collections
+from backend.data.student_index import get_student_index
+from backend.data.watermark import change_stamp
+from backend.data.admission_status import record_transitions
 import uuid
 
-# Initialize collections once at startup
-initialize_collections()
+# Initialize collections once per server process, not on every Streamlit rerun
+@st.cache_resource
+def init_collections():
+    initialize_collections()
+
+
+init_collections()
 
 # Streamlit UI
 st.title("Student Admission Form")
@@ -55,6 +63,7 @@ if st.button("Submit Application"):
         metadatas=[student_data],
         ids=[student_id]
     )
+    get_student_index().add_student(student_data)
 
     # Application data (flattened fields)
     application_data = {
@@ -67,13 +76,14 @@ if st.button("Submit Application"):
         "marks_12": marks_12,
         "aadhar_no": aadhar_no,
         "income_category": income_category,
-        "updated_on": now
+        **change_stamp()  # updated_on + numeric updated_ts for incremental agent runs
     }
     get_collection("applications").add(
         documents=[app_id],
         metadatas=[application_data],
         ids=[app_id]
     )
+    record_transitions("applications", [(None, "submitted")])
 
     # Loan request data
     loan_data = {
@@ -84,7 +94,8 @@ if st.button("Submit Application"):
         "status": "requested",
         "evaluation_notes": "",
         "evaluated_by": "",
-        "decision_date": ""
+        "decision_date": "",
+        **change_stamp()
     }
     get_collection("loan_requests").add(
         documents=[loan_id],
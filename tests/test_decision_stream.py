@@ -0,0 +1,50 @@
+from backend.data.model import ApplicationStatus
+from backend.utils.decision_stream import DecisionError, DecisionStreamParser, iter_decisions
+
+OUTPUT = (
+    'Here are the decisions:\n```json\n['
+    '{"application_id": "a1", "status": "shortlisted", "reason": "Strong {marks} and \\"leadership\\""},'
+    '{"application_id": "a2", "status": "ineligible", "reason": "Marks below } cutoff"}'
+    ']\n```'
+)
+
+
+def _parse_in_chunks(text, size):
+    parser = DecisionStreamParser()
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items + parser.close()
+
+
+def test_objects_split_across_chunk_boundaries():
+    whole = _parse_in_chunks(OUTPUT, len(OUTPUT))
+    for size in (1, 2, 3, 7, 16):
+        assert _parse_in_chunks(OUTPUT, size) == whole
+    assert [item.application_id for item in whole] == ["a1", "a2"]
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    first, second = _parse_in_chunks(OUTPUT, 5)
+    assert first.status is ApplicationStatus.SHORTLISTED
+    assert first.reason == 'Strong {marks} and "leadership"'
+    assert second.reason == "Marks below } cutoff"
+
+
+def test_ineligible_is_a_valid_status():
+    (decision,) = iter_decisions('[{"application_id": "a1", "status": "Ineligible"}]')
+    assert decision.status == "ineligible"
+
+
+def test_invalid_items_become_errors_without_stopping_the_stream():
+    items = list(iter_decisions(['[{"application_id": "a1", "status": "maybe"},',
+                                 '{"status": "eligible"}, {"application_id": "a3", "status": "eligible"}']))
+    assert [type(item) for item in items] == [DecisionError, DecisionError, type(items[2])]
+    assert "unknown status" in items[0].error
+    assert items[2].application_id == "a3"
+
+
+def test_unterminated_trailing_object_is_reported():
+    items = list(iter_decisions(['[{"application_id": "a1", "status": "eligible"}, {"application_id": "a2"']))
+    assert items[0].application_id == "a1"
+    assert isinstance(items[1], DecisionError) and items[1].error == "unterminated object"
@@ -0,0 +1,26 @@
+from backend.agents.document_checking_agent import REQUIRED_DOCUMENTS, check_documents, parse_documents
+
+
+def test_missing_documents_field_is_incomplete_without_review():
+    report, needs_review = check_documents({"id": "x", "student_name": "A"})
+    assert report["overall_status"] == "incomplete"
+    assert not needs_review
+    assert set(report["documents_status"].values()) == {"missing"}
+
+
+def test_all_required_documents_are_complete():
+    report, needs_review = check_documents({"id": "x", "documents": ", ".join(REQUIRED_DOCUMENTS)})
+    assert report["overall_status"] == "complete" and not needs_review
+
+
+def test_partial_submission_lists_missing_documents():
+    report, needs_review = check_documents({"id": "x", "documents": ["identity_proof", "photo"]})
+    assert report["overall_status"] == "incomplete" and not needs_review
+    assert "transcripts" in report["comments"]
+
+
+def test_only_unreadable_or_unknown_documents_are_flagged():
+    assert parse_documents(42) is None
+    assert check_documents({"id": "x", "documents": 42})[1]
+    report, needs_review = check_documents({"id": "x", "documents": "identity_proof,selfie"})
+    assert report["overall_status"] == "flagged" and needs_review
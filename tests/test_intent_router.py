@@ -0,0 +1,21 @@
+import pytest
+
+from backend.utils.intent_router import GENERAL, INTENT_EXAMPLES, classify, route_intent
+
+SEEDS = [(intent, example) for intent, examples in INTENT_EXAMPLES.items() for example in examples]
+
+
+@pytest.mark.parametrize("intent,example", SEEDS)
+def test_every_seed_example_classifies_to_its_own_intent(intent, example):
+    assert classify(example)[0] == intent
+    assert route_intent(example) == intent
+
+
+@pytest.mark.parametrize("prompt", ["hello", "what is the weather today", "tell me a joke", "thanks a lot"])
+def test_unrelated_prompts_fall_back_to_general(prompt):
+    assert route_intent(prompt) == GENERAL
+
+
+def test_keywords_take_priority_in_declared_order():
+    assert route_intent("Is my loan application stuck?") == "loan"
+    assert route_intent("What is the status of my application") == "status"
@@ -0,0 +1,63 @@
+import numpy as np
+
+from backend.utils.loan_allocation import INCOME_NEED, NEED_WEIGHTS, allocate, need_scores
+
+
+def test_allocate_never_exceeds_budget():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        amounts = rng.uniform(0, 300000, size=40)
+        scores = rng.uniform(0, 1, size=40)
+        budget = float(rng.uniform(0, 2000000))
+        approved = allocate(amounts, scores, budget, max_award=150000)
+        assert approved.sum() <= budget + 1e-6
+        assert np.all(approved >= 0)
+        assert np.all(approved <= np.minimum(amounts, 150000) + 1e-6)
+
+
+def test_allocate_funds_in_score_order_with_partial_boundary():
+    approved = allocate([100, 100, 100], [0.2, 0.9, 0.5], budget=150, max_award=1000)
+    assert approved.tolist() == [0.0, 100.0, 50.0]
+
+
+def test_allocate_ties_keep_input_order():
+    approved = allocate([100, 100], [0.5, 0.5], budget=100, max_award=1000)
+    assert approved.tolist() == [100.0, 0.0]
+
+
+def test_allocate_caps_awards():
+    approved = allocate([500, 50], [0.9, 0.1], budget=1000, max_award=200)
+    assert approved.tolist() == [200.0, 50.0]
+
+
+def test_tiny_partial_leftover_goes_to_smaller_lower_ranked_requests():
+    # 10 left after the first award is under 25% of the second request, but covers the third
+    approved = allocate([90, 100, 10], [0.9, 0.8, 0.1], budget=100, max_award=1000, min_partial_fraction=0.25)
+    assert approved.tolist() == [90.0, 0.0, 10.0]
+
+
+def test_many_skipped_requests_fund_every_small_one():
+    # Each large request leaves only a tiny partial award, so it is skipped in favour of the next small one
+    n = 40000
+    amounts = np.where(np.arange(n) % 2, 1e6, 1.0)
+    approved = allocate(amounts, np.linspace(1, 0, n), budget=n, max_award=np.inf, min_partial_fraction=0.25)
+    assert approved[::2].tolist() == [1.0] * (n // 2)
+    assert not approved[1::2].any()
+
+
+def test_allocate_handles_empty_and_zero_budget():
+    assert allocate([], [], budget=100).size == 0
+    assert allocate([100, 50], [0.5, 0.4], budget=0).tolist() == [0.0, 0.0]
+
+
+def test_need_scores_rank_by_income_merit_and_justification():
+    scores = need_scores(["SC/ST", "general", "unknown"], [80, 80, 80], [100000, 100000, 100000], tuition=100000)
+    assert scores[0] > scores[2] > scores[1]
+    expected = NEED_WEIGHTS["income"] * INCOME_NEED["sc/st"] + NEED_WEIGHTS["merit"] * 0.8 + NEED_WEIGHTS["justification"]
+    assert np.isclose(scores[0], expected)
+
+
+def test_need_scores_discount_oversized_requests_and_missing_marks():
+    scores = need_scores(["ews", "ews"], [float("nan"), 90], [300000, 100000], tuition=150000)
+    assert scores[0] < scores[1]
+    assert np.all((scores >= 0) & (scores <= 1))
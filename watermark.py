@@ -0,0 +1,80 @@
+# watermark.py (per-agent change watermarks for incremental processing)
+
+import os
+import time
+from datetime import datetime
+
+from backend.data.database import get_collection
+
+# Numeric change stamp written next to "updated_on". Chroma's $gt only compares numbers,
+# so the ISO string cannot be used as a cursor directly.
+CHANGE_FIELD = "updated_ts"
+
+# Stamps are wall-clock times taken in several processes (API, Streamlit, CLI) before the write
+# commits, so a record can become visible with a stamp older than records already processed.
+# Watermarks are kept this many seconds behind the start of the run that read the records.
+WATERMARK_LAG = float(os.environ.get("WATERMARK_LAG_SECONDS", "30"))
+
+
+def change_stamp():
+    """Metadata fields to merge into every record write so incremental runs can see it."""
+    now = time.time()
+    return {"updated_on": datetime.fromtimestamp(now).isoformat(), CHANGE_FIELD: now}
+
+
+def _watermark_id(agent_name: str) -> str:
+    return f"watermark:{agent_name}"
+
+
+def get_watermark(agent_name: str) -> float:
+    """Return the change stamp up to which this agent has processed records (0.0 = never)."""
+    data = get_collection("agents").get(ids=[_watermark_id(agent_name)])
+    if not data["metadatas"]:
+        return 0.0
+    return float(data["metadatas"][0].get("watermark", 0.0))
+
+
+def set_watermark(agent_name: str, value: float):
+    """Record a successful run up to the given change stamp."""
+    get_collection("agents").upsert(
+        documents=[_watermark_id(agent_name)],
+        metadatas=[{
+            "type": "watermark",
+            "agent": agent_name,
+            "watermark": float(value),
+            "updated_on": datetime.now().isoformat()
+        }],
+        ids=[_watermark_id(agent_name)]
+    )
+
+
+def reset_watermark(agent_name: str):
+    """Force the next run of this agent to re-evaluate every record."""
+    set_watermark(agent_name, 0.0)
+
+
+def changed_since(where, watermark: float):
+    """Combine a Chroma where filter with 'changed after watermark'. A zero watermark means no filter."""
+    if not watermark:
+        return where
+    changed = {CHANGE_FIELD: {"$gt": watermark}}
+    if not where:
+        return changed
+    return {"$and": [where, changed]}
+
+
+def latest_change(records, default: float = 0.0) -> float:
+    """Highest change stamp among records, used as the next watermark."""
+    stamps = [float(record[CHANGE_FIELD]) for record in records if record.get(CHANGE_FIELD) is not None]
+    return max(stamps, default=default)
+
+
+def next_watermark(previous: float, latest: float, started_at: float) -> float:
+    """
+    Watermark to store after a successful run that began reading at started_at.
+
+    It never passes started_at - WATERMARK_LAG, so records stamped shortly before the run but
+    committed after it are seen by the next run instead of being skipped for good; records in
+    the lag window may be evaluated twice. It never moves backwards.
+    """
+    return max(previous, min(latest, started_at - WATERMARK_LAG))